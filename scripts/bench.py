@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Benchmark every build step against synthetic fixtures at several scales.
+
+Each scale gets its own fixture home (fixtures.py, generated once and reused).
+The staged store and outputs are wiped first so every run is a cold build.
+Then each step's script runs in a subprocess with HOME pointed at the fixture,
+in build.py's declaration order. Wall time, peak RSS and rows/sec per step
+(rows of the raw files behind the step, upstream steps included) are appended
+to a JSON history. A step slower than --threshold times its previous run at
+the same scale is flagged.
+
+    python3 bench.py                      # scales 1 and 10
+    python3 bench.py --scales 1 10 100    # 100 is about a real drop
+    python3 bench.py gen6 gen7 --check    # exit 1 on a regression
+"""
+import argparse, fnmatch, json, os, shutil, subprocess, sys, time
+from datetime import datetime, timezone
+
+import fixtures
+from build import SCRIPTS, STEPS, dependencies
+
+HOME = os.path.expanduser("~")
+HISTORY = f"{HOME}/Projects/fedtracker-data/bench/history.json"
+FIXTURES = f"{HOME}/Projects/fedtracker-data/bench/fixtures"
+
+
+def relative(pattern):
+    return os.path.relpath(pattern, HOME)
+
+
+def step_rows(deps, rows):
+    """step -> rows of every raw file it reads, directly or through upstream steps."""
+    produced = {p for step in STEPS.values() for p in step["outputs"]}
+    result = {}
+
+    def visit(name):
+        if name not in result:
+            files = set()
+            for pattern in STEPS[name]["inputs"]:
+                if pattern not in produced:
+                    files |= {f for f in rows if fnmatch.fnmatch(f, relative(pattern))}
+            for dep in deps[name]:
+                files |= visit(dep)
+            result[name] = files
+        return result[name]
+
+    return {name: sum(rows[f] for f in visit(name)) for name in STEPS}
+
+
+def run(name, home):
+    """Run one step's script; returns (ok, seconds, peak RSS in MB)."""
+    env = dict(os.environ, HOME=home)
+    start = time.perf_counter()
+    with open(f"{home}/{name}.log", "w") as log:
+        proc = subprocess.Popen([sys.executable, os.path.join(SCRIPTS, STEPS[name]["script"])],
+                                cwd=SCRIPTS, env=env, stdout=log, stderr=subprocess.STDOUT)
+        # wait4 reports this child's own rusage, not the max over all children
+        _, status, usage = os.wait4(proc.pid, 0)
+    return os.waitstatus_to_exitcode(status) == 0, time.perf_counter() - start, usage.ru_maxrss / 1024
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPTS,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return []
+
+
+def previous(history, scale, step):
+    for run_ in reversed(history):
+        if run_["scale"] == scale:
+            for result in run_["steps"]:
+                if result["step"] == step and result["ok"]:
+                    return result
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("steps", nargs="*", help="only time these steps (their upstream steps still run)")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fixtures", default=FIXTURES, help="where the fixture homes are kept")
+    parser.add_argument("--history", default=HISTORY)
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown factor flagged as a regression")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any step regressed or failed")
+    args = parser.parse_args()
+
+    unknown = set(args.steps) - set(STEPS)
+    if unknown:
+        parser.error(f"unknown steps: {', '.join(sorted(unknown))}")
+    deps = dependencies(STEPS)
+    timed = set(args.steps or STEPS)
+    needed = set(timed)
+    for name in timed:
+        frontier = deps[name]
+        while frontier:
+            needed |= frontier
+            frontier = set().union(*(deps[d] for d in frontier)) - needed
+
+    history = load_history(args.history)
+    commit = git_commit()
+    bad = []
+    for scale in args.scales:
+        home = f"{args.fixtures}/x{scale}"
+        print(f"Scale {scale}x: fixture...")
+        rows = fixtures.load(home, scale, args.seed)
+        for path in (f"{home}/{fixtures.ROOT_DATA}/staged", f"{home}/{fixtures.ROOT_OUT}"):
+            shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(f"{home}/{fixtures.ROOT_OUT}")
+        inputs = step_rows(deps, rows)
+
+        results = []
+        for name in STEPS:
+            if name not in needed:
+                continue
+            ok, seconds, rss = run(name, home)
+            result = {
+                "step": name, "ok": ok, "seconds": round(seconds, 3), "peak_rss_mb": round(rss, 1),
+                "rows": inputs[name], "rows_per_sec": round(inputs[name] / seconds) if seconds else None,
+            }
+            prev = previous(history, scale, name)
+            flag = ""
+            if not ok:
+                flag = f"  FAILED (see {home}/{name}.log)"
+                bad.append((scale, name))
+            elif name in timed and prev and seconds > prev["seconds"] * args.threshold:
+                flag = f"  REGRESSION ({prev['seconds']:.2f}s before)"
+                bad.append((scale, name))
+            if name in timed:
+                results.append(result)
+                print(f"  {name:<20} {seconds:8.2f}s {rss:8.1f} MB {result['rows_per_sec'] or 0:>12,} rows/s{flag}")
+            if not ok:
+                break
+
+        history.append({
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": commit,
+            "scale": scale,
+            "seed": args.seed,
+            "rows": sum(rows.values()),
+            "steps": results,
+        })
+
+    os.makedirs(os.path.dirname(args.history), exist_ok=True)
+    with open(args.history, "w") as f:
+        json.dump(history, f, indent=2)
+    print(f"Done bench ({len(args.scales)} scales -> {args.history})")
+    if args.check and bad:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""Incremental build of public/data: runs only the generators whose inputs changed.
+
+Each step declares the raw files and generated outputs it reads and the outputs
+it writes. A step re-runs when its script, its raw inputs, or any upstream step
+changed; independent steps run concurrently in a process pool. With --jobs 1
+the steps run in this process instead, sharing one warm DuckDB connection.
+
+    python3 build.py              # everything that is out of date
+    python3 build.py gen6 gen7    # only these steps, if out of date
+    python3 build.py --force      # ignore recorded fingerprints
+    python3 build.py --jobs 1     # serial, in-process
+    python3 build.py --explain    # also save every query's DuckDB profile
+    python3 build.py --memory-limit 2GB   # bounded RSS: split across --jobs, spilling to disk
+    python3 build.py --series columnar    # monthly series as parallel arrays
+
+Each step's stage/query/write spans (fedtracker_pipeline.instrument) are
+written to REPORT when the build finishes.
+"""
+import argparse, contextlib, glob, hashlib, json, os, runpy, shutil, sys, time, traceback
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from fedtracker_pipeline import (
+    ACC_DEC, ACC_MONTHLY, ACC_OLD, AGY, CUBE, EMP, EMP_RAW, EMP_VALIDATION, FLOWS, FLOWS_VALIDATION, OUT, PERCENTILES,
+    PROFILES, REPORT, SEP_DEC, SEP_MONTHLY, SEP_OLD, SERIES_FORMATS, STAGED,
+    byte_size, fingerprint, host_threads, instrument,
+)
+
+SCRIPTS = os.path.dirname(os.path.abspath(__file__))
+PACKAGE = os.path.join(SCRIPTS, "fedtracker_pipeline")
+STATE = f"{STAGED}/build-state.json"
+LOGS = f"{STAGED}/logs"
+
+# Everything that reads the staged store also reads the validation of what it
+# reads (EMP_VALIDATION for the employment file, FLOWS_VALIDATION for the
+# separations/accessions store), so a drop that fails validation stops the
+# build before any generator of it runs, and a new monthly file leaves the
+# employment-only steps alone.
+# Declaration order matters only when two steps write the same output: the later
+# step (the fix_* override) runs after the earlier one. A step's "env" variables
+# are part of its fingerprint.
+STEPS = {
+    "stage": {
+        "script": "stage.py",
+        "inputs": [EMP_RAW],
+        "outputs": [EMP],
+    },
+    "ingest": {
+        "script": "ingest.py",
+        "inputs": [SEP_OLD, ACC_OLD, SEP_MONTHLY, ACC_MONTHLY],
+        "outputs": [FLOWS],
+    },
+    "validate-employment": {
+        "script": "validate_employment.py",
+        "inputs": [EMP],
+        "outputs": [EMP_VALIDATION],
+    },
+    "validate-flows": {
+        "script": "validate_flows.py",
+        "inputs": [FLOWS],
+        "outputs": [FLOWS_VALIDATION],
+    },
+    "percentiles": {
+        "script": "percentiles.py",
+        "inputs": [EMP, EMP_VALIDATION],
+        "outputs": [PERCENTILES],
+    },
+    "cube": {
+        "script": "cube.py",
+        "inputs": [FLOWS, FLOWS_VALIDATION, SEP_DEC, ACC_DEC, AGY],
+        "outputs": [CUBE],
+    },
+    "gen1": {
+        "script": "gen1-agency-stats.py",
+        "inputs": [EMP, EMP_VALIDATION, PERCENTILES],
+        "outputs": [f"{OUT}/agency-list.json", f"{OUT}/agencies", f"{OUT}/agency-index.json"],
+    },
+    "gen2": {
+        "script": "gen2-separations.py",
+        "inputs": [CUBE],
+        "env": ["FEDTRACKER_SERIES"],
+        "outputs": [f"{OUT}/separations.json", f"{OUT}/agency-separations", f"{OUT}/rif-top.json"],
+    },
+    "gen3": {
+        "script": "gen3-occupations.py",
+        "inputs": [EMP, EMP_VALIDATION, PERCENTILES],
+        "outputs": [f"{OUT}/occupations.json"],
+    },
+    "gen4": {
+        "script": "gen4-states.py",
+        "inputs": [EMP, EMP_VALIDATION, PERCENTILES],
+        "outputs": [f"{OUT}/states.json", f"{OUT}/state-detail"],
+    },
+    "gen5": {
+        "script": "gen5-salaries.py",
+        "inputs": [EMP, EMP_VALIDATION, PERCENTILES],
+        "outputs": [f"{OUT}/salary-stats.json"],
+    },
+    "gen6": {
+        "script": "gen6-trends.py",
+        "inputs": [CUBE],
+        "outputs": [f"{OUT}/trends.json"],
+    },
+    "gen7": {
+        "script": "gen7-site-stats.py",
+        "inputs": [EMP, EMP_VALIDATION, CUBE, f"{OUT}/rif-top.json"],
+        "outputs": [f"{OUT}/site-stats.json"],
+    },
+    "gen8": {
+        "script": "gen8-workforce-risk.py",
+        "inputs": [EMP, EMP_VALIDATION, FLOWS, FLOWS_VALIDATION, PERCENTILES],
+        "outputs": [f"{OUT}/{name}.json" for name in (
+            "agency-risk", "agency-features", "retirement-cliff", "retirement-risk", "brain-drain",
+            "tenure-distribution", "whos-leaving", "grade-shift",
+        )],
+    },
+    "gen9": {
+        "script": "gen9-search-index.py",
+        "inputs": [f"{OUT}/agency-list.json", f"{OUT}/occupations.json", f"{OUT}/states.json"],
+        "outputs": [f"{OUT}/search"],
+    },
+    "gen10": {
+        "script": "gen10-embeds.py",
+        "inputs": [f"{OUT}/{name}.json" for name in ("agency-risk", "doge-timeline", "state-impact")],
+        "outputs": [f"{OUT}/embed"],
+    },
+    "gen11": {
+        "script": "gen11-hierarchy.py",
+        "inputs": [EMP, EMP_VALIDATION, FLOWS, FLOWS_VALIDATION, AGY],
+        "outputs": [f"{OUT}/agency-hierarchy.json", f"{OUT}/subagencies.json", f"{OUT}/agency-subagencies"],
+    },
+    "doge": {
+        "script": "gen_doge_impact.py",
+        "inputs": [CUBE, FLOWS, FLOWS_VALIDATION, f"{OUT}/agency-list.json"],
+        "outputs": [f"{OUT}/doge-impact.json"],
+    },
+    "occupation-detail": {
+        "script": "fix_occupation_detail.py",
+        "inputs": [EMP, EMP_VALIDATION, PERCENTILES],
+        "outputs": [f"{OUT}/occupation-detail"],
+    },
+    "separations": {
+        "script": "fix_separations.py",
+        "inputs": [CUBE],
+        "outputs": [f"{OUT}/separations.json"],
+    },
+    "agency-separations": {
+        "script": "fix_agency_separations.py",
+        "inputs": [FLOWS, FLOWS_VALIDATION, f"{OUT}/agency-separations"],
+        "env": ["FEDTRACKER_SERIES"],
+        "outputs": [f"{OUT}/agency-separations", f"{OUT}/agency-separations.bin",
+                    f"{OUT}/agency-separations-index.json"],
+    },
+    "separation-types": {
+        "script": "fix_separation_types.py",
+        "inputs": [FLOWS, FLOWS_VALIDATION, f"{OUT}/agency-list.json"],
+        "env": ["FEDTRACKER_SERIES"],
+        "outputs": [f"{OUT}/separation-types"],
+    },
+}
+
+
+def dependencies(steps):
+    """step -> upstream steps: producers of its inputs, and earlier writers of its outputs."""
+    producers = {}
+    deps = {name: set() for name in steps}
+    for name, step in steps.items():
+        for path in step["outputs"]:
+            deps[name] |= set(producers.get(path, []))
+            producers.setdefault(path, []).append(name)
+    for name, step in steps.items():
+        for path in step["inputs"]:
+            deps[name] |= {p for p in producers.get(path, []) if p != name}
+    return deps
+
+
+def downstream(name, deps):
+    """Every step that (transitively) depends on `name`."""
+    found, frontier = set(), {name}
+    while frontier:
+        frontier = {n for n, d in deps.items() if d & frontier} - found
+        found |= frontier
+    return found
+
+
+def raw_fingerprints(paths, previous):
+    fps = {}
+    for pattern in paths:
+        for path in sorted(glob.glob(pattern)):
+            fps[path] = fingerprint(path, previous.get(path))
+    return fps
+
+
+def fingerprints(steps, deps, previous_raw):
+    """Hash of (script, env settings, raw inputs, upstream fingerprints) per step."""
+    produced = {p for step in steps.values() for p in step["outputs"]}
+    raw = raw_fingerprints({p for s in steps.values() for p in s["inputs"] if p not in produced}, previous_raw)
+    # Every generator imports the shared package, so its source is an input of every step
+    package = hashlib.sha256()
+    for path in sorted(glob.glob(f"{PACKAGE}/*.py")):
+        with open(path, "rb") as f:
+            package.update(f.read())
+    result = {}
+
+    def visit(name):
+        if name in result:
+            return result[name]
+        step = steps[name]
+        h = hashlib.sha256(package.digest())
+        with open(os.path.join(SCRIPTS, step["script"]), "rb") as f:
+            h.update(f.read())
+        for var in step.get("env", []):
+            h.update(f"{var}={os.environ.get(var, '')}".encode())
+        for pattern in step["inputs"]:
+            if pattern in produced:
+                continue
+            for path in sorted(glob.glob(pattern)):
+                h.update(f"{path}:{raw[path]['sha256']}".encode())
+        for dep in sorted(deps[name]):
+            h.update(f"{dep}:{visit(dep)}".encode())
+        result[name] = h.hexdigest()
+        return result[name]
+
+    for name in steps:
+        visit(name)
+    return result, raw
+
+
+def run_step(name, script):
+    """Run one generator, logging its output to LOGS/{name}.log. Returns its span tree too."""
+    os.makedirs(LOGS, exist_ok=True)
+    path = os.path.join(SCRIPTS, script)
+    start = time.time()
+    instrument.begin(name)
+    with open(f"{LOGS}/{name}.log", "w") as log, contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        sys.argv = [path]
+        try:
+            runpy.run_path(path, run_name="__main__")
+            ok = True
+        except SystemExit as e:
+            ok = not e.code
+        except Exception:
+            traceback.print_exc()
+            ok = False
+    return name, ok, time.time() - start, instrument.end()
+
+
+class InlineExecutor(Executor):
+    """Runs each step as it is submitted, in this process (--jobs 1)."""
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def load_state():
+    if os.path.exists(STATE):
+        with open(STATE) as f:
+            return json.load(f)
+    return {"steps": {}, "raw": {}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("steps", nargs="*", help="only consider these steps")
+    parser.add_argument("--force", action="store_true", help="re-run even if inputs are unchanged")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="concurrent generators")
+    parser.add_argument("--dry-run", action="store_true", help="list what would run")
+    parser.add_argument("--explain", action="store_true", help="save each query's DuckDB profile (EXPLAIN ANALYZE)")
+    parser.add_argument("--memory-limit", help="DuckDB memory for the whole build, e.g. 2GB (default: DuckDB's own)")
+    parser.add_argument("--threads", type=int, help="DuckDB threads per step (default: host CPUs / jobs)")
+    parser.add_argument("--series", choices=SERIES_FORMATS, default="rows",
+                        help="shape of monthly series in agency-separations/ and separation-types/")
+    args = parser.parse_args()
+    os.environ["FEDTRACKER_SERIES"] = args.series
+    # Concurrent steps share the host: each gets its slice of the budget and the CPUs
+    jobs = max(1, args.jobs)
+    os.environ["FEDTRACKER_THREADS"] = str(args.threads or max(1, host_threads() // jobs))
+    if args.memory_limit:
+        try:
+            per_step = byte_size(args.memory_limit) // jobs
+        except ValueError as e:
+            parser.error(str(e))
+        os.environ["FEDTRACKER_MEMORY_LIMIT"] = f"{per_step // 2**20}MiB"
+    if args.explain:
+        # read at query time, in this process and in the pool's workers
+        os.environ["FEDTRACKER_EXPLAIN"] = "1"
+        shutil.rmtree(PROFILES, ignore_errors=True)
+
+    unknown = set(args.steps) - set(STEPS)
+    if unknown:
+        parser.error(f"unknown steps: {', '.join(sorted(unknown))}")
+
+    os.makedirs(STAGED, exist_ok=True)
+    state = load_state()
+    deps = dependencies(STEPS)
+    fps, raw = fingerprints(STEPS, deps, state["raw"])
+
+    selected = set(args.steps or STEPS)
+    dirty = set()
+    for name in STEPS:
+        if name not in selected:
+            continue
+        fresh = state["steps"].get(name) == fps[name]
+        outputs_exist = all(glob.glob(p) for p in STEPS[name]["outputs"])
+        if args.force or not fresh or not outputs_exist:
+            dirty.add(name)
+        else:
+            print(f"  {name}: up to date")
+
+    if args.dry_run or not dirty:
+        for name in STEPS:
+            if name in dirty:
+                print(f"  {name}: would run")
+        return
+
+    # Only wait on upstream steps that are themselves running this build
+    # (in declaration order, so --jobs 1 runs stage/ingest before any generator)
+    waiting = {name: deps[name] & dirty for name in STEPS if name in dirty}
+    failed = set()
+    report = {"started": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "jobs": args.jobs, "explain": args.explain,
+              "series": args.series,
+              "threads": int(os.environ["FEDTRACKER_THREADS"]),
+              "memory_limit": os.environ.get("FEDTRACKER_MEMORY_LIMIT"), "steps": {}}
+    build_start = time.time()
+    pool = InlineExecutor() if args.jobs <= 1 else ProcessPoolExecutor(max_workers=args.jobs)
+    with pool:
+        running = {}
+        while waiting or running:
+            for name in [n for n, d in waiting.items() if not d]:
+                del waiting[name]
+                print(f"  {name}: running {STEPS[name]['script']}")
+                running[pool.submit(run_step, name, STEPS[name]["script"])] = name
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, ok, elapsed, spans = future.result()
+                del running[future]
+                report["steps"][name] = {**(spans or {}), "ok": ok, "seconds": round(elapsed, 4)}
+                if ok:
+                    state["steps"][name] = fps[name]
+                    print(f"  {name}: done in {elapsed:.1f}s")
+                else:
+                    failed.add(name)
+                    print(f"  {name}: FAILED after {elapsed:.1f}s (see {LOGS}/{name}.log)")
+                    for other in sorted(downstream(name, deps) & set(waiting)):
+                        del waiting[other]
+                        failed.add(other)
+                        print(f"  {other}: skipped, {name} failed")
+                for d in waiting.values():
+                    d.discard(name)
+
+    state["raw"] = raw
+    with open(STATE, "w") as f:
+        json.dump(state, f, indent=2)
+    report["seconds"] = round(time.time() - build_start, 4)
+    instrument.write_report(report)
+    print(f"  report: {REPORT}")
+    if failed:
+        sys.exit(1)
+    print("Done build")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Materialise the accession/separation cube the trend and separation generators roll up.
+
+One row per (flow, source, month, agency, separation type) with the summed count,
+from the FY2020-2024 bulk partials (agency via DTagy), the December 2025 release
+and the monthly files. gen2, gen6, gen7, gen_doge_impact and fix_separations read
+this instead of each re-aggregating the raw separations and accessions.
+"""
+import os
+
+from fedtracker_pipeline import CUBE, get_connection, normalize, stage
+
+con = get_connection()
+
+# The agy view has one row per AGYSUB, so the bulk rows join to at most one agency
+stage("Building flows cube")
+tmp = f"{CUBE}.tmp"
+con.execute("""
+    CREATE OR REPLACE TEMP TABLE cube_rows AS
+        SELECT 'sep' as flow, 'old' as source, s.month, a.AGY as agency_code, a.AGYT as agency,
+               s.sep, '' as sep_name, CAST(SUM(s.cnt) AS BIGINT) as cnt
+        FROM old_seps s LEFT JOIN agy a ON s.agysub = a.AGYSUB
+        GROUP BY ALL
+        UNION ALL
+        SELECT 'sep', 'dec', month, agency_code, agency, sep, '', CAST(SUM(cnt) AS BIGINT) FROM dec_seps GROUP BY ALL
+        UNION ALL
+        SELECT 'sep', 'monthly', month, agency_code, agency, sep, sep_name, CAST(SUM(cnt) AS BIGINT) FROM new_seps GROUP BY ALL
+        UNION ALL
+        SELECT 'acc', 'old', s.month, a.AGY, a.AGYT, '', '', CAST(SUM(s.cnt) AS BIGINT)
+        FROM old_accs s LEFT JOIN agy a ON s.agysub = a.AGYSUB
+        GROUP BY ALL
+        UNION ALL
+        SELECT 'acc', 'dec', month, agency_code, agency, '', '', CAST(SUM(cnt) AS BIGINT) FROM dec_accs GROUP BY ALL
+        UNION ALL
+        SELECT 'acc', 'monthly', month, agency_code, agency, '', '', CAST(SUM(cnt) AS BIGINT) FROM new_accs GROUP BY ALL
+""")
+# DTagy's "XX-NAME" titles and the December release's raw names; the monthly ones are canonical already
+normalize(con, "cube_rows", {"agency": "agency"})
+con.execute(f"COPY (SELECT * FROM cube_rows ORDER BY flow, source, month) TO '{tmp}' (FORMAT parquet, COMPRESSION zstd)")
+con.execute("DROP TABLE cube_rows")
+os.replace(tmp, CUBE)
+
+for flow, source, months, rows, total in con.execute(f"""
+    SELECT flow, source, COUNT(DISTINCT month), COUNT(*), SUM(cnt) FROM read_parquet('{CUBE}')
+    GROUP BY ALL ORDER BY ALL
+""").fetchall():
+    print(f"  {flow}/{source}: {months} months, {rows:,} cells, {total:,} actions")
+print("Done cube")
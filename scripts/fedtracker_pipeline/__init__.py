@@ -0,0 +1,18 @@
+"""Shared paths, name normalization, DuckDB connection and query engine for the generator scripts."""
+from .codes import QUIT, RETIREMENTS, RIF, SEP_TYPES, TERMINATION
+from .db import SPLICE_MONTH, byte_size, configure, connect, get_connection, host_threads
+from .fingerprint import fingerprint
+from .instrument import count, span, stage, traced
+from .names import agency_name, normalize, title_case
+from .output import (
+    SERIES_FORMATS, FanOut, columnar, file_sha256, series, series_format, write_bytes, write_int32, write_json,
+)
+from .paths import (
+    ACC_DEC, ACC_MONTHLY, ACC_OLD, AGY, CUBE, DATA, EMP, EMP_RAW, EMP_VALIDATION, FLOWS, FLOWS_VALIDATION, MONTHLY,
+    OUT, PERCENTILES, PROFILES, REPORT, SEP_DEC, SEP_MONTHLY, SEP_OLD, SPILL, STAGED,
+)
+from .quantiles import QUANTILES, percentiles, quantiles_sql
+from .query import QueryError, aggregate
+from .risk import RISK_FACTORS, risk_score
+from .topn import top_n
+from .validation import Checks
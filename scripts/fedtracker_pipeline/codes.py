@@ -0,0 +1,20 @@
+"""FedScope separation category codes, shared by the generators and validate_flows.py."""
+
+SEP_TYPES = {
+    "SA": ("Transfer Out", "Employees who transferred to another federal agency"),
+    "SB": ("Transfer Out (Mass)", "Mass transfers between agencies due to reorganization"),
+    "SC": ("Quit", "Voluntary resignations from federal service"),
+    "SD": ("Voluntary Retirement", "Standard voluntary retirements"),
+    "SE": ("Early Retirement", "Early-out retirements, often offered during downsizing"),
+    "SF": ("Disability Retirement", "Retirements due to disability"),
+    "SG": ("Other Retirement", "Other types of retirement"),
+    "SH": ("RIF", "Reduction in Force - involuntary separations due to budget/reorganization"),
+    "SJ": ("Termination", "Involuntary terminations including probationary and for-cause"),
+    "SK": ("Death", "Deaths of federal employees"),
+    "SL": ("Other", "Other types of separations"),
+}
+# Reduction in Force, in both the bulk and the monthly files
+RIF = "SH"
+QUIT = "SC"
+TERMINATION = "SJ"
+RETIREMENTS = ("SD", "SE", "SF", "SG")
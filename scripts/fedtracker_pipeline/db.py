@@ -0,0 +1,138 @@
+"""One lazily-created DuckDB connection with the staged data registered as views.
+
+Every generator calls get_connection() instead of duckdb.connect(), so when
+several generators run in one process (build.py --jobs 1) they share a warm
+connection: the Parquet metadata, the DTagy lookup and the attached aggregate
+store are set up once. Views whose source appears later in the run (build.py
+writing the cube, say) are registered on the next get_connection() call.
+
+Views (each registered only if its source exists):
+    emp           staged employment rows (typed; REDACTED pay is NULL)
+    agy           DTagy lookup, one row per AGYSUB: AGY/AGYT, AGYSUBT and agency type AGYTYP/AGYTYPT
+    old_seps      FY2020-2024 separations partials (month, agysub, agency_code, sep, cnt, ...)
+    new_seps      monthly separations partials (month, agency_code, agency, sep, sep_name, ...)
+    profile       monthly separations/accessions per (flow, month, sep, dim, value) with pay/LOS sums
+    seps_spliced  old_seps through SPLICE_MONTH, new_seps after it, in the store's row shape
+    old_accs      FY2020-2024 accessions partials (month, agysub, agency_code, cnt)
+    new_accs      monthly accessions partials (month, agency_code, agency, cnt)
+    dec_seps      December 2025 release separations (month, agency_code, agency, sep, cnt)
+    dec_accs      December 2025 release accessions (month, agency_code, agency, cnt)
+    cube          month x agency x sep x source flow totals written by cube.py
+    salary_percentiles  count-weighted salary p10..p90 per (dim, key) written by percentiles.py
+
+Every connection (these and stage/ingest's own) goes through configure():
+threads default to the CPUs this process may use, and operators that outgrow
+FEDTRACKER_MEMORY_LIMIT spill to SPILL instead of failing. build.py's
+--memory-limit/--threads set those variables for every step.
+"""
+import os
+import re
+
+import duckdb
+
+from .instrument import traced
+from .paths import ACC_DEC, AGY, CUBE, EMP, FLOWS, PERCENTILES, SEP_DEC, SPILL
+
+# The FY2020-2024 bulk files are authoritative through this month, the monthly files after it
+SPLICE_MONTH = "202309"
+
+SOURCE_VIEWS = {
+    "emp": (EMP, f"SELECT * FROM read_parquet('{EMP}')"),
+    # DTagy is one row per AGYSUB in practice; collapsed so a duplicate can never
+    # double-count the rows joined to it
+    "agy": (AGY, f"""
+        SELECT AGYSUB, arg_min(AGY, AGYT) as AGY, min(AGYT) as AGYT, min(AGYSUBT) as AGYSUBT,
+               arg_min(AGYTYP, AGYT) as AGYTYP, arg_min(AGYTYPT, AGYT) as AGYTYPT
+        FROM read_csv('{AGY}', header=true, all_varchar=true)
+        GROUP BY AGYSUB
+    """),
+    "dec_seps": (SEP_DEC, f"""
+        SELECT personnel_action_effective_date_yyyymm as month, agency_code, agency,
+               separation_category_code as sep, CAST(count AS INTEGER) as cnt
+        FROM read_json_auto('{SEP_DEC}', format='newline_delimited')
+    """),
+    "dec_accs": (ACC_DEC, f"""
+        SELECT personnel_action_effective_date_yyyymm as month, agency_code, agency,
+               CAST(count AS INTEGER) as cnt
+        FROM read_json_auto('{ACC_DEC}', format='newline_delimited')
+    """),
+    "cube": (CUBE, f"SELECT * FROM read_parquet('{CUBE}')"),
+    "salary_percentiles": (PERCENTILES, f"SELECT * FROM read_parquet('{PERCENTILES}')"),
+}
+
+FLOW_VIEWS = {
+    "old_seps": """
+        SELECT month, agysub, agency_code, sep, cnt, salary_sum, salary_cnt, los_sum, los_cnt
+        FROM flows.seps WHERE source = 'old'
+    """,
+    "new_seps": """
+        SELECT month, agency_code, agency, sep, sep_name, occupational_series, age_bracket, cnt,
+               salary_sum, salary_cnt, los_sum, los_cnt
+        FROM flows.seps WHERE source = 'monthly'
+    """,
+    "profile": "SELECT * EXCLUDE (file) FROM flows.profile",
+    "seps_spliced": f"""
+        SELECT * FROM flows.seps
+        WHERE (source = 'old' AND month <= '{SPLICE_MONTH}') OR (source = 'monthly' AND month > '{SPLICE_MONTH}')
+    """,
+    "old_accs": "SELECT month, agysub, agency_code, cnt FROM flows.accs WHERE source = 'old'",
+    "new_accs": "SELECT month, agency_code, agency, cnt FROM flows.accs WHERE source = 'monthly'",
+}
+
+_con = None
+
+UNITS = {"": 1, "B": 1, "KB": 10**3, "MB": 10**6, "GB": 10**9, "TB": 10**12,
+         "KIB": 2**10, "MIB": 2**20, "GIB": 2**30, "TIB": 2**40}
+
+
+def byte_size(text):
+    """'4GB' / '512MiB' / '1.5 GB' -> bytes, with DuckDB's unit conventions."""
+    m = re.fullmatch(r"\s*([\d.]+)\s*([a-zA-Z]*)\s*", text)
+    if not m or m.group(2).upper() not in UNITS:
+        raise ValueError(f"not a memory size: {text!r}")
+    return int(float(m.group(1)) * UNITS[m.group(2).upper()])
+
+
+def host_threads():
+    """CPUs this process may run on (the runner's cgroup/affinity, not the whole machine)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def configure(con):
+    """Apply the resource budget to a connection; returns it."""
+    con.execute(f"SET threads = {int(os.environ.get('FEDTRACKER_THREADS') or host_threads())}")
+    con.execute(f"SET temp_directory = '{SPILL}'")
+    limit = os.environ.get("FEDTRACKER_MEMORY_LIMIT")
+    if limit:
+        con.execute(f"SET memory_limit = '{byte_size(limit)}B'")
+    return con
+
+
+def register_views(con):
+    """Create the views whose sources exist and are not registered yet."""
+    have = {r[0] for r in con.execute("SELECT view_name FROM duckdb_views() WHERE NOT internal").fetchall()}
+    for name, (path, sql) in SOURCE_VIEWS.items():
+        if name not in have and os.path.exists(path):
+            con.execute(f"CREATE VIEW {name} AS {sql}")
+    if os.path.exists(FLOWS) and not set(FLOW_VIEWS) <= have:
+        con.execute(f"ATTACH IF NOT EXISTS '{FLOWS}' AS flows (READ_ONLY)")
+        for name, sql in FLOW_VIEWS.items():
+            con.execute(f"CREATE OR REPLACE VIEW {name} AS {sql}")
+
+
+def connect():
+    """A fresh in-memory connection with every available view registered."""
+    con = configure(duckdb.connect())
+    register_views(con)
+    return traced(con)
+
+
+def get_connection():
+    """The process-wide connection, created on first use. Its queries are traced (instrument.py)."""
+    global _con
+    if _con is None:
+        _con = traced(configure(duckdb.connect()))
+    register_views(_con.untraced())
+    return _con
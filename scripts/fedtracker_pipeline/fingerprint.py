@@ -0,0 +1,22 @@
+"""Content fingerprints for raw input files."""
+import hashlib
+import os
+
+
+def sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(8 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def fingerprint(path, previous=None):
+    """Size/mtime/sha256 of a raw file; the hash is reused when size and mtime match."""
+    st = os.stat(path)
+    fp = {"path": path, "size": st.st_size, "mtime": int(st.st_mtime)}
+    if previous and previous.get("size") == fp["size"] and previous.get("mtime") == fp["mtime"]:
+        fp["sha256"] = previous["sha256"]
+    else:
+        fp["sha256"] = sha256(path)
+    return fp
@@ -0,0 +1,250 @@
+"""Run instrumentation: nested timing spans with rows/bytes counters, traced queries and a run report.
+
+Generators mark their stages with stage("Top paid agencies"), which prints the
+usual "Top paid agencies..." line and times everything up to the next stage.
+Every query on a traced connection (get_connection() returns one) is a child
+span with its time and the rows fetched from it; write_json adds the bytes
+and files it wrote to the innermost open span.
+
+With FEDTRACKER_EXPLAIN=1 (build.py --explain) DuckDB's profiler is switched on
+and each query's profile -- the operator tree EXPLAIN ANALYZE prints, with
+timings and cardinalities, as JSON -- is saved under PROFILES and linked from
+its span. The query runs once; nothing is re-executed to get its plan.
+
+build.py collects one tree per step into REPORT. A generator run on its own
+merges its tree into REPORT under the script's file name when it exits.
+"""
+import atexit
+import contextlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from .paths import PROFILES, REPORT
+
+_lock = threading.Lock()
+_stack = []
+_stage = None
+_step = None
+_queries = 0
+
+
+class Span:
+    __slots__ = ("name", "kind", "seconds", "rows", "bytes", "files", "children", "profile", "_start")
+
+    def __init__(self, name, kind):
+        self.name, self.kind = name, kind
+        self.seconds = 0.0
+        self.rows = self.bytes = self.files = 0
+        self.children = []
+        self.profile = None
+        self._start = time.perf_counter()
+
+    def close(self):
+        if self._start is not None:
+            self.seconds += time.perf_counter() - self._start
+            self._start = None
+
+    def as_dict(self):
+        d = {"name": self.name, "kind": self.kind, "seconds": round(self.seconds, 4)}
+        for key in ("rows", "bytes", "files", "profile"):
+            if getattr(self, key):
+                d[key] = getattr(self, key)
+        if self.children:
+            d["children"] = [c.as_dict() for c in self.children]
+        return d
+
+
+def begin(step):
+    """Start a fresh tree for one build step."""
+    global _stage, _step, _queries
+    _stack[:] = [Span(step, "step")]
+    _stage, _step, _queries = None, step, 0
+
+
+def end():
+    """Close every open span and return the step's tree as a dict."""
+    global _stage, _step
+    if not _stack:
+        return None
+    for s in reversed(_stack):
+        s.close()
+    root = _stack[0].as_dict()
+    _stack.clear()
+    _stage = _step = None
+    return root
+
+
+def _current():
+    if not _stack:
+        # Not under build.py: report this script on its own when it exits
+        begin(os.path.basename(sys.argv[0]) or "python")
+        atexit.register(_report_standalone)
+    return _stack[-1]
+
+
+def _open(name, kind):
+    s = Span(name, kind)
+    with _lock:
+        _current().children.append(s)
+        _stack.append(s)
+    return s
+
+
+def _close(s):
+    s.close()
+    with _lock:
+        if s in _stack:
+            del _stack[_stack.index(s):]
+
+
+@contextlib.contextmanager
+def span(name, kind="span"):
+    """Time a block (a write loop, a per-agency query batch) as a child of the open span."""
+    s = _open(name, kind)
+    try:
+        yield s
+    finally:
+        _close(s)
+
+
+def stage(name):
+    """Print "name..." and time everything from here to the next stage() as one span."""
+    global _stage
+    if _stage is not None:
+        _close(_stage)
+    print(f"{name}...")
+    _stage = _open(name, "stage")
+    return _stage
+
+
+def count(rows=0, bytes=0, files=0):
+    """Add to the innermost open span's counters (safe from FanOut's worker threads)."""
+    with _lock:
+        s = _current()
+        s.rows += rows
+        s.bytes += bytes
+        s.files += files
+
+
+def _label(sql):
+    return re.sub(r"\s+", " ", sql).strip()[:100]
+
+
+class TracedResult:
+    """What execute()/sql() return: the fetch calls are timed and their rows counted."""
+
+    def __init__(self, target, s):
+        self._target, self._span = target, s
+
+    def _fetch(self, method, *args):
+        start = time.perf_counter()
+        result = getattr(self._target, method)(*args)
+        self._span.seconds += time.perf_counter() - start
+        if result is not None:
+            self._span.rows += 1 if method == "fetchone" else len(result)
+        return result
+
+    def fetchall(self):
+        return self._fetch("fetchall")
+
+    def fetchone(self):
+        return self._fetch("fetchone")
+
+    def fetchmany(self, size=1):
+        return self._fetch("fetchmany", size)
+
+    def fetchdf(self):
+        return self._fetch("fetchdf")
+
+    def df(self):
+        return self._fetch("df")
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+
+class TracedConnection:
+    """A DuckDB connection whose execute() and sql() calls are recorded as query spans."""
+
+    def __init__(self, con):
+        self._con = con
+        self._profiling = False
+
+    def _query(self, sql):
+        global _queries
+        # Queries are leaves whose time is added up explicitly (execute, then each fetch)
+        s = Span(_label(sql), "query")
+        s._start = None
+        with _lock:
+            _current().children.append(s)
+        if os.environ.get("FEDTRACKER_EXPLAIN") == "1":
+            if not self._profiling:
+                self._con.execute("SET enable_profiling = 'json'")
+                self._profiling = True
+            with _lock:
+                _queries += 1
+                s.profile = f"{PROFILES}/{_step}/{_queries:03d}.json"
+            os.makedirs(os.path.dirname(s.profile), exist_ok=True)
+            self._con.execute(f"SET profiling_output = '{s.profile}'")
+        return s
+
+    def execute(self, query, parameters=None):
+        s = self._query(query)
+        start = time.perf_counter()
+        if parameters is None:
+            self._con.execute(query)
+        else:
+            self._con.execute(query, parameters)
+        s.seconds += time.perf_counter() - start
+        return TracedResult(self._con, s)
+
+    def sql(self, query):
+        # Relations are lazy: most of the time lands in the fetch
+        s = self._query(query)
+        start = time.perf_counter()
+        relation = self._con.sql(query)
+        s.seconds += time.perf_counter() - start
+        return TracedResult(relation, s)
+
+    def untraced(self):
+        """The raw connection, with profiles of its queries kept away from the traced ones'."""
+        if self._profiling:
+            self._con.execute(f"SET profiling_output = '{PROFILES}/untraced.json'")
+        return self._con
+
+    def __getattr__(self, name):
+        return getattr(self._con, name)
+
+
+def traced(con):
+    return con if isinstance(con, TracedConnection) else TracedConnection(con)
+
+
+def load_report():
+    if os.path.exists(REPORT):
+        with open(REPORT) as f:
+            return json.load(f)
+    return {"steps": {}}
+
+
+def write_report(report):
+    os.makedirs(os.path.dirname(REPORT), exist_ok=True)
+    report["finished"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    tmp = f"{REPORT}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp, REPORT)
+
+
+def _report_standalone():
+    tree = end()
+    if tree is None:
+        return
+    report = load_report()
+    report["steps"][tree["name"]] = tree
+    write_report(report)
@@ -0,0 +1,100 @@
+"""Canonical display names for agencies, occupations, states and labels.
+
+Names are normalized once, where data enters the pipeline (stage.py for
+employment, ingest.py for the monthly files, cube.py for DTagy and the December
+release), so every generator reads and ships canonical names as they are.
+normalize() maps a column through a dictionary built from its distinct values
+only: a few hundred Python calls (memoized) and one join, however many rows.
+"""
+import functools
+import re
+
+SMALL_WORDS = {"of", "the", "and", "for", "in", "on", "at", "to", "by", "or", "a", "an"}
+# Values the generators filter on; never re-cased
+SENTINELS = {"", "*", "REDACTED", "INVALID", "NO DATA REPORTED"}
+
+# OPM abbreviations/truncations, keyed by the lower-cased title-cased name
+# (the same corrections src/lib/format.ts applies at render time)
+AGENCY_FIXES = {k.lower(): v for k, v in {
+    "Ar": "Department of the Army",
+    "Af": "Department of the Air Force",
+    "Nv": "Department of the Navy",
+    "Dd": "Department of Defense",
+    "Dfc": "U.S. International Development Finance Corporation",
+    "U.S.agency for Global Media": "U.S. Agency for Global Media",
+    "U.S.-China Economic & Security Rev Cmsn": "U.S.-China Economic and Security Review Commission",
+    "U.S. Cmsn on Internatl Religious Freedom": "U.S. Commission on International Religious Freedom",
+    "U.S. Agency for International Dev": "U.S. Agency for International Development",
+    "Court Services and Offendr Supervsn Agy": "Court Services and Offender Supervision Agency",
+    "Fed Mediation and Conciliation Service": "Federal Mediation and Conciliation Service",
+    "Corp for National and Community Service": "Corporation for National and Community Service",
+    "Internat Boundary Cmsn: U.S. and Canada": "International Boundary Commission: U.S. and Canada",
+    "Inter Bound and Water Comm U.S. Section": "International Boundary and Water Commission U.S. Section",
+    "International Joint Cmsn: U.S. & Canada": "International Joint Commission: U.S. and Canada",
+    "Department of Housing and Urban Developm": "Department of Housing and Urban Development",
+    "Federal Permitting Improvement Stee": "Federal Permitting Improvement Steering Council",
+    "Federal Permitting Improvement Steering": "Federal Permitting Improvement Steering Council",
+    "Council of Insp. Gen. on Integ.& Effic.": "Council of Inspectors General on Integrity and Efficiency",
+    "Ofc of the National Cyber Dir": "Office of the National Cyber Director",
+    "Adv Council on Historic Preservation": "Advisory Council on Historic Preservation",
+    "Cmte for Purch Frm Pple Blind or Sev Dis": "Committee for Purchase From People Who Are Blind or Severely Disabled",
+    "National Cmsn on Libraries and Info Science": "National Commission on Libraries and Information Science",
+    "National Foundation on Arts and Humanities": "National Foundation on the Arts and Humanities",
+    "Privacy and Civil Liberties Oversight": "Privacy and Civil Liberties Oversight Board",
+    "Department of Treasury": "Department of the Treasury",
+    "Department of Interior": "Department of the Interior",
+    "Department of Health and Human Serv": "Department of Health and Human Services",
+    "Department of Veterans Affair": "Department of Veterans Affairs",
+}.items()}
+CANONICAL_AGENCIES = set(AGENCY_FIXES.values())
+
+
+@functools.lru_cache(maxsize=None)
+def title_case(s):
+    if not s or s in SENTINELS:
+        return s
+    # words, and hyphenated parts of words ("U.S.-CHINA" -> "U.S.-China")
+    parts = re.split(r"(\s+|-(?=[A-Za-z]))", s)
+    result = []
+    for i, w in enumerate(parts):
+        if not w or w.isspace() or w == "-":
+            result.append(w)
+        elif i > 0 and w.lower() in SMALL_WORDS:
+            result.append(w.lower())
+        else:
+            result.append(w[:1].upper() + w[1:].lower())
+    name = "".join(result)
+    name = re.sub(r"\bU\.s\.", "U.S.", name)
+    return re.sub(r"\bNat\b", "National", name)
+
+
+@functools.lru_cache(maxsize=None)
+def agency_name(s):
+    """'TR-DEPARTMENT OF TREASURY' / 'DEPARTMENT OF TREASURY' -> 'Department of the Treasury'."""
+    if not s or s in SENTINELS or s in CANONICAL_AGENCIES:
+        return s
+    name = title_case(re.sub(r"^[A-Z0-9]{2,4}-(?=\S)", "", s))
+    return AGENCY_FIXES.get(name.lower(), name)
+
+
+CANONICAL = {
+    "agency": agency_name,
+    "title": title_case,
+}
+
+
+def normalize(con, table, columns):
+    """Rewrite table's columns ({column: "agency" | "title"}) to canonical names in place."""
+    for column, kind in columns.items():
+        raw = [r[0] for r in con.execute(f"SELECT DISTINCT {column} FROM {table} WHERE {column} IS NOT NULL").fetchall()]
+        pairs = [(v, CANONICAL[kind](v)) for v in raw]
+        pairs = [(v, name) for v, name in pairs if name != v]
+        if not pairs:
+            continue
+        con.execute("CREATE OR REPLACE TEMP TABLE canonical_names (raw VARCHAR, name VARCHAR)")
+        con.executemany("INSERT INTO canonical_names VALUES (?, ?)", pairs)
+        con.execute(f"""
+            UPDATE {table} SET {column} = canonical_names.name
+            FROM canonical_names WHERE {table}.{column} = canonical_names.raw
+        """)
+    con.execute("DROP TABLE IF EXISTS canonical_names")
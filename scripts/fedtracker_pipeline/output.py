@@ -0,0 +1,167 @@
+"""Writing public/data artifacts: compact streamed JSON, columnar series, packed int32 matrices,
+prebuilt payloads, precompressed siblings, atomic skip-if-unchanged writes and a threaded fan-out for per-entity files."""
+import array
+import contextlib
+import gzip
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from .instrument import count
+
+try:
+    import brotli
+except ImportError:  # optional: .br siblings are skipped without it
+    brotli = None
+
+COMPACT = json.JSONEncoder(separators=(",", ":"))
+BUFFER = 1 << 16
+# Shape of monthly series in the per-entity JSON: "rows" (one object per month)
+# or "columnar" (parallel arrays); build.py --series sets it
+SERIES_FORMATS = ("rows", "columnar")
+
+
+def columnar(rows, keys=None):
+    """[{"month": m, "SA": n, ...}, ...] -> {"month": [...], "SA": [...], ...}.
+
+    Parallel arrays name each key once instead of once per row, which roughly
+    halves a monthly series. Only for consumers that read the columnar form.
+    """
+    keys = keys or (list(rows[0]) if rows else [])
+    return {k: [row.get(k, 0) for row in rows] for k in keys}
+
+
+def series_format():
+    fmt = os.environ.get("FEDTRACKER_SERIES", "rows")
+    if fmt not in SERIES_FORMATS:
+        raise ValueError(f"FEDTRACKER_SERIES must be one of {', '.join(SERIES_FORMATS)}, not {fmt!r}")
+    return fmt
+
+
+def series(rows, keys=None):
+    """A monthly series in the configured shape: rows as they are, or columnar(rows, keys)."""
+    return columnar(rows, keys) if series_format() == "columnar" else rows
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(BUFFER), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def same_content(path, digest, size):
+    if not os.path.exists(path) or os.path.getsize(path) != size:
+        return False
+    return file_sha256(path) == digest
+
+
+def write_json(path, obj, compress=False, indent=None):
+    """Stream obj to path as compact JSON without building the whole string in memory.
+
+    With compress, path.gz (and path.br, if brotli is installed) are written from
+    the same stream so a static host can serve them directly; without it, any
+    siblings left by an earlier compressed write are removed. Everything goes to
+    .tmp files that are renamed into place, and a file whose content did not
+    change is left untouched (mtime included). Returns whether path was rewritten.
+    """
+    encoder = COMPACT if indent is None else json.JSONEncoder(indent=indent)
+    targets = [path] + ([f"{path}.gz"] + ([f"{path}.br"] if brotli else []) if compress else [])
+    digest = hashlib.sha256()
+    with contextlib.ExitStack() as stack:
+        sinks = [stack.enter_context(open(f"{path}.tmp", "wb")).write, digest.update]
+        if compress:
+            sinks.append(stack.enter_context(gzip.GzipFile(f"{path}.gz.tmp", "wb", compresslevel=9, mtime=0)).write)
+            if brotli:
+                br_file = stack.enter_context(open(f"{path}.br.tmp", "wb"))
+                br = brotli.Compressor(quality=11)
+                sinks.append(lambda data: br_file.write(br.process(data)))
+
+        buf, size = [], 0
+        for chunk in encoder.iterencode(obj):
+            buf.append(chunk)
+            size += len(chunk)
+            if size >= BUFFER:
+                data = "".join(buf).encode()
+                for write in sinks:
+                    write(data)
+                buf, size = [], 0
+        data = "".join(buf).encode()
+        for write in sinks:
+            write(data)
+        if compress and brotli:
+            br_file.write(br.finish())
+
+    size = os.path.getsize(f"{path}.tmp")
+    unchanged = same_content(path, digest.hexdigest(), size) and all(os.path.exists(t) for t in targets)
+    count(bytes=size, files=0 if unchanged else 1)
+    for target in targets:
+        if unchanged:
+            os.remove(f"{target}.tmp")
+        else:
+            os.replace(f"{target}.tmp", target)
+    # Siblings of an earlier compressed write would be served in place of path
+    for sibling in (f"{path}.gz", f"{path}.br"):
+        if sibling not in targets and os.path.exists(sibling):
+            os.remove(sibling)
+    return not unchanged
+
+
+def write_int32(path, values):
+    """Write values as packed little-endian int32, atomically and only if changed.
+
+    Returns whether path was rewritten.
+    """
+    data = array.array("i", values)
+    if data.itemsize != 4:
+        raise ValueError(f"int32 arrays are {data.itemsize} bytes here")
+    if sys.byteorder != "little":
+        data.byteswap()
+    return write_bytes(path, data.tobytes())
+
+
+def write_bytes(path, data):
+    """Write data to path atomically and only if changed. Returns whether path was rewritten."""
+    unchanged = same_content(path, hashlib.sha256(data).hexdigest(), len(data))
+    count(bytes=len(data), files=0 if unchanged else 1)
+    if not unchanged:
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(data)
+        os.replace(f"{path}.tmp", path)
+    return not unchanged
+
+
+class FanOut:
+    """Writes many per-entity files from a thread pool.
+
+        with FanOut() as out:
+            for code, detail in details.items():
+                out.write(f"{OUT}/agencies/{code}.json", detail)
+        print(f"{out.written} written, {out.unchanged} unchanged")
+    """
+
+    def __init__(self, jobs=8, compress=False):
+        self.pool = ThreadPoolExecutor(max_workers=jobs)
+        self.compress = compress
+        self.futures = []
+        self.written = self.unchanged = 0
+
+    def write(self, path, obj):
+        self.futures.append(self.pool.submit(write_json, path, obj, self.compress))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.pool.shutdown(wait=True)
+        if exc[0] is not None:
+            return False
+        for future in self.futures:
+            if future.result():
+                self.written += 1
+            else:
+                self.unchanged += 1
+        return False
@@ -0,0 +1,30 @@
+"""Where the raw FedScope drops, the staged store and the published JSON live."""
+import os
+
+DATA = os.path.expanduser("~/Projects/fedtracker-data/extracted")
+MONTHLY = os.path.expanduser("~/Projects/fedtracker-data/monthly")
+STAGED = os.path.expanduser("~/Projects/fedtracker-data/staged")
+OUT = os.path.expanduser("~/Projects/fedtracker-app/public/data")
+
+# Raw inputs
+EMP_RAW = f"{DATA}/employment-dec2025.txt"
+SEP_OLD = f"{DATA}/SEPDATA_FY2020-2024.TXT"
+ACC_OLD = f"{DATA}/ACCDATA_FY2020-2024.TXT"
+SEP_DEC = f"{DATA}/separations-dec2025.json"
+ACC_DEC = f"{DATA}/accessions-dec2025.json"
+SEP_MONTHLY = f"{MONTHLY}/separations_*.txt"
+ACC_MONTHLY = f"{MONTHLY}/accessions_*.txt"
+AGY = f"{DATA}/DTagy.txt"
+
+# Staged store (stage.py, ingest.py, cube.py)
+EMP = f"{STAGED}/employment.parquet"
+FLOWS = f"{STAGED}/flows.duckdb"
+CUBE = f"{STAGED}/flows-cube.parquet"
+PERCENTILES = f"{STAGED}/salary-percentiles.parquet"
+PROFILES = f"{STAGED}/profiles"
+# validate_employment.py's and validate_flows.py's checks of the staged store
+EMP_VALIDATION = f"{STAGED}/validation-employment.json"
+FLOWS_VALIDATION = f"{STAGED}/validation-flows.json"
+# Run report of the last build, with the data rather than in the app repo
+REPORT = f"{STAGED}/run-report.json"
+SPILL = f"{STAGED}/duckdb-tmp"
@@ -0,0 +1,45 @@
+"""Exact weighted quantiles for many groupings in one pass.
+
+Employment rows carry a head count, so a salary percentile is a quantile of the
+salary distribution weighted by `count`. One GROUPING SETS scan reduces the rows
+to a weighted histogram per (dimension, key, salary) -- DuckDB builds it from
+per-thread partial aggregates that merge exactly, which is what a t-digest/KLL
+sketch would approximate -- and a running sum over each key's histogram gives
+every quantile at once: the smallest salary whose cumulative weight reaches
+q x the key's total.
+"""
+
+QUANTILES = {"p10": 0.10, "p25": 0.25, "median": 0.50, "p75": 0.75, "p90": 0.90}
+
+
+def quantiles_sql(source, keys, value, weight, where="TRUE"):
+    """(dim, key, weight, p10 ... p90) for every key of every {dim: expr} in keys, plus dim 'all'."""
+    aliases = {dim: f"k{i}" for i, dim in enumerate(keys)}
+    inner = ", ".join(f"{expr} as {aliases[dim]}" for dim, expr in keys.items())
+    sets = ", ".join(f"({a}, v)" for a in aliases.values()) + ", (v)"
+    dim_case = " ".join(f"WHEN GROUPING({a}) = 0 THEN '{dim}'" for dim, a in aliases.items())
+    key_case = " ".join(f"WHEN GROUPING({a}) = 0 THEN CAST({a} AS VARCHAR)" for a in aliases.values())
+    picks = ", ".join(f"MIN(v) FILTER (WHERE cum >= {q} * total) as {name}" for name, q in QUANTILES.items())
+    return f"""
+        WITH hist AS (
+            SELECT CASE {dim_case} ELSE 'all' END as dim, COALESCE(CASE {key_case} END, '') as key,
+                   v, SUM(w) as n
+            FROM (SELECT {inner}, {value} as v, {weight} as w FROM {source} WHERE {value} IS NOT NULL AND {where})
+            GROUP BY GROUPING SETS ({sets})
+        ),
+        cdf AS (
+            SELECT dim, key, v,
+                   SUM(n) OVER (PARTITION BY dim, key ORDER BY v) as cum,
+                   SUM(n) OVER (PARTITION BY dim, key) as total
+            FROM hist
+        )
+        SELECT dim, key, any_value(total) as weight, {picks}
+        FROM cdf GROUP BY dim, key
+    """
+
+
+def percentiles(con, dim, view="salary_percentiles"):
+    """{key: {"p10": ..., "median": ..., "p90": ...}} for one dimension of a quantiles table."""
+    names = list(QUANTILES)
+    return {key: {n: int(round(v)) for n, v in zip(names, values)}
+            for key, *values in con.execute(f"SELECT key, {', '.join(names)} FROM {view} WHERE dim = ?", [dim]).fetchall()}
@@ -0,0 +1,151 @@
+"""Parameterised aggregates over the staged store, with an LRU result cache.
+
+One entry point for ad-hoc slices that have no precomputed file in public/data:
+
+    aggregate("emp", by=["grade"], where={"agency": ["VA"], "state": ["CA"]})
+    aggregate("seps", by=["month"], where={"sep": ["SH"], "month_from": ["202401"]})
+
+Dimensions, filters and measures are names from SOURCES, never SQL, and filter
+values are bound as query parameters. Results are cached per (query, staged
+files' mtimes), so a rebuilt store is never served stale. query.py serves this
+over HTTP and the command line; generators calling it share their get_connection().
+"""
+import functools
+import os
+import threading
+
+from .db import get_connection
+from .paths import CUBE, EMP, FLOWS
+
+# source -> (view, {dimension: column}, {measure: SQL aggregate}, staged files it reads)
+SOURCES = {
+    "emp": (
+        "emp",
+        {
+            "agency": "agency_code",
+            "agency_name": "agency",
+            "occupation": "occupational_series_code",
+            "occupation_name": "occupational_series",
+            "occupational_group": "occupational_group",
+            "state": "duty_station_state_abbreviation",
+            "grade": "grade",
+            "pay_plan": "pay_plan_code",
+            "age": "age_bracket",
+            "education": "education_level",
+            "stem": "stem_occupation_type",
+        },
+        {
+            "count": "SUM(count)",
+            "avg_salary": """round(SUM(annualized_adjusted_basic_pay * count)
+                             / SUM(count) FILTER (WHERE annualized_adjusted_basic_pay IS NOT NULL))""",
+            "avg_los": """round(SUM(length_of_service_years * count)
+                          / SUM(count) FILTER (WHERE length_of_service_years IS NOT NULL), 1)""",
+        },
+        [EMP],
+    ),
+    # Separations: the bulk file through SPLICE_MONTH, the monthly files after it.
+    # Occupation and age are only in the monthly files, salary/LOS only in the bulk file.
+    "seps": (
+        "seps_spliced",
+        {
+            "agency": "agency_code",
+            "month": "month",
+            "year": "substr(month, 1, 4)",
+            "sep": "sep",
+            "occupation_name": "occupational_series",
+            "age": "age_bracket",
+            "source": "source",
+        },
+        {
+            "count": "SUM(cnt)",
+            "avg_salary": "round(SUM(salary_sum) / SUM(salary_cnt))",
+            "avg_los": "round(SUM(los_sum) / SUM(los_cnt), 1)",
+        },
+        [FLOWS],
+    ),
+    # Separations and accessions per month x agency x type, every source (cube.py)
+    "flows": (
+        "cube",
+        {
+            "flow": "flow",
+            "source": "source",
+            "month": "month",
+            "year": "substr(month, 1, 4)",
+            "agency": "agency_code",
+            "agency_name": "agency",
+            "sep": "sep",
+        },
+        {"count": "SUM(cnt)"},
+        [CUBE],
+    ),
+}
+# Filters beyond equality on a dimension: inclusive month range
+RANGES = {"month_from": ("month", ">="), "month_to": ("month", "<=")}
+CACHE_SIZE = 256
+
+_lock = threading.Lock()
+
+
+class QueryError(ValueError):
+    """A query naming an unknown source, dimension, filter or measure."""
+
+
+def _version(files):
+    return tuple(os.stat(f).st_mtime_ns if os.path.exists(f) else 0 for f in files)
+
+
+def _sql(source, by, where, measures, limit):
+    if source not in SOURCES:
+        raise QueryError(f"unknown source {source!r}; one of {', '.join(SOURCES)}")
+    view, dims, aggs, _ = SOURCES[source]
+    for name in by:
+        if name not in dims:
+            raise QueryError(f"{source} has no dimension {name!r}; one of {', '.join(dims)}")
+    for name in measures:
+        if name not in aggs:
+            raise QueryError(f"{source} has no measure {name!r}; one of {', '.join(aggs)}")
+    conditions, params = [], []
+    for name, values in where:
+        if name in RANGES and RANGES[name][0] in dims:
+            dim, op = RANGES[name]
+            conditions.append(f"{dims[dim]} {op} ?")
+            params.append(values[-1])
+        elif name in dims:
+            conditions.append(f"{dims[name]} IN ({', '.join('?' for _ in values)})")
+            params.extend(values)
+        else:
+            ranges = [r for r, (dim, _) in RANGES.items() if dim in dims]
+            raise QueryError(f"{source} cannot filter on {name!r}; one of {', '.join([*dims, *ranges])}")
+    select = [f"{dims[name]} as {name}" for name in by] + [f"{aggs[name]} as {name}" for name in measures]
+    sql = f"SELECT {', '.join(select)} FROM {view} WHERE {' AND '.join(conditions) or 'TRUE'}"
+    if by:
+        sql += f" GROUP BY ALL ORDER BY {measures[0]} DESC NULLS LAST, {', '.join(by)}"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    return sql, params
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _cached(source, by, where, measures, limit, version):
+    sql, params = _sql(source, by, where, measures, limit)
+    # One connection is shared by every caller; DuckDB runs each query on all cores
+    with _lock:
+        rows = get_connection().execute(sql, params).fetchall()
+    return [dict(zip([*by, *measures], row)) for row in rows]
+
+
+def aggregate(source, by=(), where=None, measures=("count",), limit=None):
+    """Rows of {dimension..., measure...} for one slice, largest first measure first.
+
+    where maps a dimension (or month_from/month_to) to a value or list of values.
+    """
+    where = tuple(sorted(
+        (name, tuple(str(v) for v in (values if isinstance(values, (list, tuple)) else [values])))
+        for name, values in (where or {}).items()
+    ))
+    files = SOURCES[source][3] if source in SOURCES else []
+    return _cached(source, tuple(by), where, tuple(measures), limit, _version(files))
+
+
+def cache_info():
+    return _cached.cache_info()._asdict()
@@ -0,0 +1,26 @@
+"""The agency risk score shown on /risk, as the published agency-risk.json computes it.
+
+Each factor saturates at its cap and contributes at most its weight. The inputs
+are the agency-risk.json fields as they are rounded there, which is what
+reproduces the published scores exactly (tests/test_risk_score.py). Workforce
+reduction (reductionPct) carries no weight in the published scores.
+"""
+
+# factor -> (weight, value at which the factor saturates)
+RISK_FACTORS = {
+    "sepChange": (20, 100),      # % change in separations, 2025 vs 2024 (increases only)
+    "retirementPct": (25, 40),   # % of employees near retirement age
+    "rifPct": (20, 2),           # RIFs as a % of employees
+    "quitRate": (20, 60),        # quits as a % of separations
+}
+
+
+def risk_score(agency):
+    """riskScore of an agency-risk.json row, from its sepChange, retirementPct, rifCount, employees and quitRate."""
+    values = {
+        "sepChange": max(agency["sepChange"], 0),
+        "retirementPct": agency["retirementPct"],
+        "rifPct": agency["rifCount"] / agency["employees"] * 100 if agency["employees"] else 0,
+        "quitRate": agency["quitRate"],
+    }
+    return round(sum(weight * min(values[f] / cap, 1) for f, (weight, cap) in RISK_FACTORS.items()))
@@ -0,0 +1,34 @@
+"""Set-based top-N breakdowns for per-entity detail files.
+
+Instead of one query per entity (occupation, state, agency...), run one grouped
+query over every entity at once, rank rows within each entity with ROW_NUMBER(),
+and split the result in Python.
+"""
+from collections import defaultdict
+
+
+def top_n(con, source, key, by, measures, order, where="TRUE", n=None):
+    """Return {key value: [row, ...]} for every entity in one query.
+
+    by       -- {alias: expr} grouping columns within each entity
+    measures -- {alias: expr} aggregates
+    order    -- ranking within an entity, in terms of the aliases (e.g. "cnt DESC");
+                the `by` aliases are appended as a tie-breaker so output is stable
+    n        -- keep only the first n rows per entity (None keeps all)
+
+    Each row is a tuple of the `by` values followed by the `measures` values.
+    """
+    select = ", ".join(f"{expr} as {alias}" for alias, expr in {**by, **measures}.items())
+    ties = ", ".join(by)
+    limit = f"WHERE rn <= {n}" if n else ""
+    rows = con.execute(f"""
+        SELECT * EXCLUDE (rn) FROM (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY _key ORDER BY {order}, {ties}) as rn
+            FROM (SELECT {key} as _key, {select} FROM {source} WHERE {where} GROUP BY ALL)
+        ) {limit}
+        ORDER BY _key, rn
+    """).fetchall()
+    out = defaultdict(list)
+    for row in rows:
+        out[row[0]].append(row[1:])
+    return out
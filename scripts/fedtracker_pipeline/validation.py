@@ -0,0 +1,37 @@
+"""Recording the validate_*.py checks: one result file per script, exit 1 on errors."""
+import json
+import os
+import sys
+
+
+class Checks:
+    """The checks of one validation script, written to `path` by finish()."""
+
+    def __init__(self, path):
+        self.path = path
+        self.checks = []
+
+    def previous(self, key):
+        """`key` as the last run wrote it ({} on the first run)."""
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path) as f:
+            return json.load(f).get(key, {})
+
+    def check(self, name, problems, detail, status="error"):
+        """Record a check; problems is the list of offending rows (empty = ok)."""
+        ok = not problems
+        self.checks.append({"check": name, "status": "ok" if ok else status,
+                            "detail": None if ok else detail, "rows": [list(p) for p in problems[:20]]})
+        print(f"  {name}: {'ok' if ok else status.upper() + ' - ' + detail}")
+
+    def finish(self, **extra):
+        """Write the checks (and `extra`) atomically; exit 1 if any check is an error."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(f"{self.path}.tmp", "w") as f:
+            json.dump({"checks": self.checks, **extra}, f, indent=2, default=str)
+        os.replace(f"{self.path}.tmp", self.path)
+        failed = [c["check"] for c in self.checks if c["status"] == "error"]
+        if failed:
+            print(f"Validation FAILED: {', '.join(failed)} (see {self.path})")
+            sys.exit(1)
@@ -1,87 +1,80 @@
 #!/usr/bin/env python3
-"""Update agency-separations JSON files with new monthly data (Oct 2023+)."""
-import csv
-import json
+"""Update agency-separations JSON files with new monthly data (Oct 2023+).
+
+Also writes every agency's series into one shared file, agency-separations.bin:
+packed little-endian int32, one contiguous block per agency of (months x SEP_CODES)
+counts, month-major. agency-separations-index.json gives each agency's byte
+offset, first month (an index into "months") and month count, so a page reads
+one agency's slice without parsing any other agency's records.
+"""
 import os
-import glob
-from collections import defaultdict
+from itertools import groupby
 
-SEP_TYPES = ["SA","SB","SC","SD","SE","SF","SG","SH","SJ","SK","SL"]
-out_dir = os.path.expanduser("~/Projects/fedtracker-app/public/data/agency-separations")
+from fedtracker_pipeline import OUT, SEP_TYPES, FanOut, get_connection, series, stage, write_int32, write_json
 
-# Step 1: Read old bulk file for agency-level monthly data through Sep 2023
-old_file = os.path.expanduser("~/Projects/fedtracker-data/extracted/SEPDATA_FY2020-2024.TXT")
-# agency -> month -> sep -> count
-data = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
-agency_names = {}
+SEP_CODES = list(SEP_TYPES)
+out_dir = f"{OUT}/agency-separations"
 
-# Load existing agency names from files
-for fn in os.listdir(out_dir):
-    if fn.endswith('.json'):
-        code = fn.replace('.json', '')
-        try:
-            with open(os.path.join(out_dir, fn)) as f:
-                # Read just the first 200 chars to get the name
-                content = f.read(200)
-                import re
-                m = re.search(r'"name":\s*"([^"]+)"', content)
-                if m:
-                    agency_names[code] = m.group(1)
-        except:
-            pass
+# Per-month partials from ingest.py: old bulk file through Sep 2023 (agency = first
+# two chars of AGYSUB), monthly files from Oct 2023
+con = get_connection()
+sep_list = ", ".join(f"'{s}'" for s in SEP_CODES)
 
-print("Reading old bulk file...")
-with open(old_file, 'r') as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        month = row['EFDATE'].strip()
-        sep = row['SEP'].strip()
-        count = int(row['COUNT'].strip())
-        agysub = row['AGYSUB'].strip()[:2]
-        if sep in SEP_TYPES and month <= "202309":
-            data[agysub][month][sep] += count
+# Keep the names already written by gen2; read them in one scan
+agency_names = {}
+if any(fn.endswith('.json') for fn in os.listdir(out_dir)):
+    agency_names = dict(con.execute(f"""
+        SELECT parse_filename(filename, true), name
+        FROM read_json('{out_dir}/*.json', columns={{code: 'VARCHAR', name: 'VARCHAR'}}, filename=true)
+        WHERE name IS NOT NULL AND name != ''
+    """).fetchall())
 
-print(f"Old data: {len(data)} agencies")
+# Agencies that only appear in the monthly files keep their (canonical) monthly name
+for agency_code, name in con.execute(f"""
+    SELECT agency_code, arg_min(agency, month) FROM seps_spliced
+    WHERE source = 'monthly' AND sep IN ({sep_list}) AND agency_code != ''
+    GROUP BY agency_code
+""").fetchall():
+    agency_names.setdefault(agency_code, name)
 
-# Step 2: Add new monthly data
-monthly_dir = os.path.expanduser("~/Projects/fedtracker-data/monthly/")
-files = sorted(glob.glob(os.path.join(monthly_dir, "separations_*.txt")))
-for fpath in files:
-    basename = os.path.basename(fpath)
-    month = basename.replace("separations_", "").replace(".txt", "")
-    if month <= "202309":
-        continue
-    with open(fpath, 'r') as f:
-        reader = csv.DictReader(f, delimiter='|')
-        for row in reader:
-            sep = row['separation_category_code'].strip()
-            count = int(row['count'].strip())
-            agency_code = row.get('agency_code', '').strip()
-            if sep in SEP_TYPES and agency_code:
-                data[agency_code][month][sep] += count
-                if agency_code not in agency_names:
-                    agency_names[agency_code] = row.get('agency', '').strip()
+# One row per (agency, month) with a column per separation type
+stage("Reading separations store")
+pivot = ", ".join(f"COALESCE(SUM(cnt) FILTER (WHERE sep = '{s}'), 0)" for s in SEP_CODES)
+rows = con.execute(f"""
+    SELECT agency_code, month, {pivot} FROM seps_spliced
+    WHERE sep IN ({sep_list}) AND (source = 'old' OR agency_code != '')
+    GROUP BY agency_code, month
+    ORDER BY agency_code, month
+""").fetchall()
 
-print(f"Total: {len(data)} agencies after adding new monthly data")
+# Write out
+stage("Writing agency series")
+all_months = sorted({r[1] for r in rows})
+month_index = {m: i for i, m in enumerate(all_months)}
+matrix, agencies = [], {}
+with FanOut() as out:
+    for agency_code, months in groupby(rows, key=lambda r: r[0]):
+        months = list(months)
+        result = {
+            "code": agency_code,
+            "name": agency_names.get(agency_code, agency_code),
+            "monthly": series([{"month": r[1], **dict(zip(SEP_CODES, r[2:]))} for r in months], ["month", *SEP_CODES])
+        }
+        out.write(os.path.join(out_dir, f"{agency_code}.json"), result)
 
-# Step 3: Write out
-for agency_code in data:
-    months = sorted(data[agency_code].keys())
-    monthly_list = []
-    for m in months:
-        entry = {"month": m}
-        for sep in SEP_TYPES:
-            entry[sep] = data[agency_code][m].get(sep, 0)
-        monthly_list.append(entry)
-    
-    result = {
-        "code": agency_code,
-        "name": agency_names.get(agency_code, agency_code),
-        "monthly": monthly_list
-    }
-    
-    out_path = os.path.join(out_dir, f"{agency_code}.json")
-    with open(out_path, 'w') as f:
-        json.dump(result, f)
+        # Months with no separations inside the agency's span are zero-filled
+        first, last = month_index[months[0][1]], month_index[months[-1][1]]
+        block = [[0] * len(SEP_CODES) for _ in range(last - first + 1)]
+        for r in months:
+            block[month_index[r[1]] - first] = [int(n) for n in r[2:]]
+        agencies[agency_code] = {"name": result["name"], "offset": len(matrix) * 4,
+                                 "start": first, "count": len(block)}
+        for counts in block:
+            matrix.extend(counts)
 
-print(f"Written {len(data)} agency separation files")
+print(f"Written {out.written} agency separation files ({out.unchanged} unchanged)")
+write_int32(f"{OUT}/agency-separations.bin", matrix)
+write_json(f"{OUT}/agency-separations-index.json", {
+    "dtype": "int32le", "types": SEP_CODES, "months": all_months, "agencies": agencies,
+})
+print(f"  agency-separations.bin: {len(agencies)} agencies x {len(all_months)} months, {len(matrix) * 4:,} bytes")
@@ -1,105 +1,66 @@
 #!/usr/bin/env python3
 """Generate separation-types/{CODE}.json detail files."""
-import csv
 import json
 import os
-import glob
 from collections import defaultdict
 
-SEP_TYPES = {
-    "SA": ("Transfer Out", "Employees who transferred to another federal agency"),
-    "SB": ("Transfer Out (Mass)", "Mass transfers between agencies due to reorganization"),
-    "SC": ("Quit", "Voluntary resignations from federal service"),
-    "SD": ("Voluntary Retirement", "Standard voluntary retirements"),
-    "SE": ("Early Retirement", "Early-out retirements, often offered during downsizing"),
-    "SF": ("Disability Retirement", "Retirements due to disability"),
-    "SG": ("Other Retirement", "Other types of retirement"),
-    "SH": ("RIF", "Reduction in Force - involuntary separations due to budget/reorganization"),
-    "SJ": ("Termination", "Involuntary terminations including probationary and for-cause"),
-    "SK": ("Death", "Deaths of federal employees"),
-    "SL": ("Other", "Other types of separations"),
-}
+from fedtracker_pipeline import OUT, SEP_TYPES, get_connection, series, stage, write_json
 
 AGENCY_NAMES = {}
 # Load agency names from agency-list.json if available
-agency_list_path = os.path.expanduser("~/Projects/fedtracker-app/public/data/agency-list.json")
+agency_list_path = f"{OUT}/agency-list.json"
 if os.path.exists(agency_list_path):
     with open(agency_list_path) as f:
         for a in json.load(f):
             AGENCY_NAMES[a.get("code", "")] = a.get("name", "")
 
+# Per-month partials from ingest.py: old bulk file through Sep 2023, monthly files
+# from Oct 2023. Salary/LOS come from the old file only; occupation and age from
+# the monthly files only.
+con = get_connection()
+sep_list = ", ".join(f"'{s}'" for s in SEP_TYPES)
+
+def by_type(column, where="TRUE"):
+    """sep -> {column value: count}, largest first (ties by value)."""
+    out = defaultdict(lambda: defaultdict(int))
+    for sep, key, count in con.execute(f"""
+        SELECT sep, {column}, SUM(cnt) as n FROM seps_spliced
+        WHERE sep IN ({sep_list}) AND {where}
+        GROUP BY sep, {column}
+        ORDER BY sep, n DESC, {column}
+    """).fetchall():
+        out[sep][key] = int(count)
+    return out
+
+stage("Reading separations store")
 # Monthly trend from old + new
-monthly_by_type = defaultdict(lambda: defaultdict(int))
+monthly_by_type = by_type("month")
 # Agency totals per type
-agency_by_type = defaultdict(lambda: defaultdict(int))
+agency_by_type = by_type("agency_code", "(source = 'old' OR agency_code != '')")
 # For new monthly files only: demographics
-occ_by_type = defaultdict(lambda: defaultdict(int))
-age_by_type = defaultdict(lambda: defaultdict(int))
+occ_by_type = by_type("occupational_series", "source = 'monthly' AND occupational_series != ''")
+age_by_type = by_type("age_bracket", "source = 'monthly' AND age_bracket NOT IN ('', 'REDACTED')")
 salary_by_type = defaultdict(lambda: {"total_salary": 0, "total_count": 0})
 los_by_type = defaultdict(lambda: {"total_los": 0.0, "total_count": 0})
+for sep, salary, salary_cnt, los, los_cnt in con.execute(f"""
+    SELECT sep, SUM(salary_sum), SUM(salary_cnt), SUM(los_sum), SUM(los_cnt) FROM seps_spliced
+    WHERE sep IN ({sep_list}) AND source = 'old'
+    GROUP BY sep
+""").fetchall():
+    salary_by_type[sep] = {"total_salary": salary or 0, "total_count": int(salary_cnt or 0)}
+    los_by_type[sep] = {"total_los": los or 0.0, "total_count": int(los_cnt or 0)}
 
-# Old bulk file
-old_file = os.path.expanduser("~/Projects/fedtracker-data/extracted/SEPDATA_FY2020-2024.TXT")
-print("Reading old bulk file...")
-with open(old_file, 'r') as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        month = row['EFDATE'].strip()
-        sep = row['SEP'].strip()
-        count = int(row['COUNT'].strip())
-        if sep not in SEP_TYPES or month > "202309":
-            continue
-        monthly_by_type[sep][month] += count
-        agysub = row['AGYSUB'].strip()[:2]
-        agency_by_type[sep][agysub] += count
-        # Salary/LOS from old file
-        try:
-            sal = float(row['SALARY'].strip())
-            salary_by_type[sep]["total_salary"] += sal * count
-            salary_by_type[sep]["total_count"] += count
-        except:
-            pass
-        try:
-            los = float(row['LOS'].strip())
-            los_by_type[sep]["total_los"] += los * count
-            los_by_type[sep]["total_count"] += count
-        except:
-            pass
-
-# New monthly files
-monthly_dir = os.path.expanduser("~/Projects/fedtracker-data/monthly/")
-files = sorted(glob.glob(os.path.join(monthly_dir, "separations_*.txt")))
-print(f"Reading {len(files)} monthly files...")
-for fpath in files:
-    basename = os.path.basename(fpath)
-    month = basename.replace("separations_", "").replace(".txt", "")
-    if month <= "202309":
-        continue
-    with open(fpath, 'r') as f:
-        reader = csv.DictReader(f, delimiter='|')
-        for row in reader:
-            sep = row['separation_category_code'].strip()
-            count = int(row['count'].strip())
-            if sep not in SEP_TYPES:
-                continue
-            monthly_by_type[sep][month] += count
-            # Agency
-            agency_code = row.get('agency_code', '').strip()
-            if agency_code:
-                agency_by_type[sep][agency_code] += count
-                if agency_code not in AGENCY_NAMES:
-                    AGENCY_NAMES[agency_code] = row.get('agency', '').strip()
-            # Occupation
-            occ_name = row.get('occupational_series', '').strip()
-            if occ_name:
-                occ_by_type[sep][occ_name] += count
-            # Age
-            age = row.get('age_bracket', '').strip()
-            if age and age != 'REDACTED':
-                age_by_type[sep][age] += count
+# Agencies that only appear in the monthly files keep their (canonical) monthly name
+for agency_code, name in con.execute(f"""
+    SELECT agency_code, arg_min(agency, month) FROM seps_spliced
+    WHERE source = 'monthly' AND sep IN ({sep_list}) AND agency_code != ''
+    GROUP BY agency_code
+""").fetchall():
+    if agency_code not in AGENCY_NAMES:
+        AGENCY_NAMES[agency_code] = name
 
 # Build output
-out_dir = os.path.expanduser("~/Projects/fedtracker-app/public/data/separation-types")
+out_dir = f"{OUT}/separation-types"
 os.makedirs(out_dir, exist_ok=True)
 
 for code, (name, desc) in SEP_TYPES.items():
@@ -107,6 +68,7 @@ for code, (name, desc) in SEP_TYPES.items():
     trend = [{"month": m, "count": monthly_by_type[code][m]}
              for m in sorted(monthly_by_type[code].keys())]
     
+    # Equal counts keep by_type's order, by code/name (the per-row version kept first appearance)
     top_agencies = sorted(agency_by_type[code].items(), key=lambda x: -x[1])[:20]
     top_agencies = [{"code": c, "name": AGENCY_NAMES.get(c, c), "count": n} for c, n in top_agencies]
     
@@ -129,7 +91,7 @@ for code, (name, desc) in SEP_TYPES.items():
     result = {
         "code": code, "name": name, "description": desc,
         "totalCount": total,
-        "monthlyTrend": trend,
+        "monthlyTrend": series(trend, ["month", "count"]),
         "topAgencies": top_agencies,
         "topOccupations": top_occs,
         "byAge": age_dist,
@@ -138,8 +100,7 @@ for code, (name, desc) in SEP_TYPES.items():
     }
     
     out_path = os.path.join(out_dir, f"{code}.json")
-    with open(out_path, 'w') as f:
-        json.dump(result, f)
+    write_json(out_path, result)
     print(f"  {code} ({name}): {total:,} total, {len(trend)} months")
 
 print("Done!")
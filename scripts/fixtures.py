@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""Write synthetic FedScope drops (real column layouts, REDACTED values) for benchmarks.
+
+The files land where fedtracker_pipeline expects them relative to a home
+directory, so any script runs against them with HOME pointed there:
+
+    python3 fixtures.py /tmp/fx10 --scale 10
+    HOME=/tmp/fx10 python3 build.py --jobs 1
+
+Scale 1 is ~20k employment rows; scale 100 is about the size of a real drop.
+"""
+import argparse, json, os, random
+
+ROOT_DATA = "Projects/fedtracker-data"
+ROOT_OUT = "Projects/fedtracker-app/public/data"
+MANIFEST = "fixture.json"
+
+# Rows per file at scale 1
+EMP_ROWS = 20_000
+OLD_ROWS = 20_000
+MONTHLY_ROWS = 300
+DEC_ROWS = 1_000
+
+AGENCIES = [
+    ("VA", "DEPARTMENT OF VETERANS AFFAIRS"), ("HS", "DEPARTMENT OF HOMELAND SECURITY"),
+    ("TR", "DEPARTMENT OF THE TREASURY"), ("ED", "DEPARTMENT OF EDUCATION"),
+    ("AG", "DEPARTMENT OF AGRICULTURE"), ("DJ", "DEPARTMENT OF JUSTICE"),
+    ("GS", "GENERAL SERVICES ADMINISTRATION"), ("SZ", "SOCIAL SECURITY ADMINISTRATION"),
+    ("NN", "NATIONAL AERONAUTICS AND SPACE ADMINISTRATION"), ("SS", "SELECTIVE SERVICE SYSTEM"),
+]
+SUBELEMENTS = {code: [(f"{code}{i:02d}", f"{name} COMPONENT {i}") for i in range(1, 5)] for code, name in AGENCIES}
+OCCUPATIONS = [
+    ("0610", "NURSE", "MEDICAL, HOSPITAL, DENTAL, AND PUBLIC HEALTH", "HEALTH"),
+    ("0301", "MISCELLANEOUS ADMINISTRATION AND PROGRAM", "GENERAL ADMINISTRATIVE, CLERICAL, AND OFFICE SERVICES", "ALL OTHER OCCUPATIONS"),
+    ("2210", "INFORMATION TECHNOLOGY MANAGEMENT", "INFORMATION TECHNOLOGY", "TECHNOLOGY"),
+    ("0905", "GENERAL ATTORNEY", "LEGAL AND KINDRED", "ALL OTHER OCCUPATIONS"),
+    ("0801", "GENERAL ENGINEERING", "ENGINEERING AND ARCHITECTURE", "ENGINEERING"),
+    ("1811", "CRIMINAL INVESTIGATION", "INVESTIGATION", "ALL OTHER OCCUPATIONS"),
+    ("0343", "MANAGEMENT AND PROGRAM ANALYSIS", "GENERAL ADMINISTRATIVE, CLERICAL, AND OFFICE SERVICES", "ALL OTHER OCCUPATIONS"),
+    ("1102", "CONTRACTING", "BUSINESS AND INDUSTRY", "ALL OTHER OCCUPATIONS"),
+]
+STATES = [("CA", "CALIFORNIA"), ("DC", "DISTRICT OF COLUMBIA"), ("TX", "TEXAS"), ("VA", "VIRGINIA"),
+          ("MD", "MARYLAND"), ("FL", "FLORIDA"), ("REDACTED", "REDACTED")]
+EDUCATION = ["HIGH SCHOOL GRADUATE OR CERTIFICATE OF EQUIVALENCY", "BACHELOR'S DEGREE", "MASTER'S DEGREE",
+             "ASSOCIATE DEGREE", "DOCTORATE DEGREE", "REDACTED"]
+AGES = ["LESS THAN 20", "20-24", "25-29", "30-34", "35-39", "40-44", "45-49", "50-54", "55-59", "60-64",
+        "65 OR MORE", "REDACTED"]
+SUPERVISORY = ["ALL OTHER POSITIONS", "SUPERVISOR OR MANAGER", "TEAM LEADER", "REDACTED"]
+PAY_PLANS = ["GS", "GS", "GS", "VN", "NH", "ES"]
+SEPARATIONS = {
+    "SA": "TRANSFER OUT - INDIVIDUAL TRANSFER", "SB": "TRANSFER OUT - MASS TRANSFER", "SC": "QUIT",
+    "SD": "RETIREMENT - VOLUNTARY", "SE": "RETIREMENT - EARLY OUT", "SF": "RETIREMENT - DISABILITY",
+    "SG": "RETIREMENT - OTHER", "SH": "REDUCTION IN FORCE (RIF)", "SJ": "TERMINATION OR REMOVAL",
+    "SK": "DEATH", "SL": "OTHER SEPARATION",
+}
+ACCESSIONS = ["AA", "AB", "AC"]
+OLD_MONTHS = [f"{y}{m:02d}" for y in range(2019, 2025) for m in range(1, 13) if "201910" <= f"{y}{m:02d}" <= "202409"]
+MONTHLY_MONTHS = [f"{y}{m:02d}" for y in range(2023, 2026) for m in range(1, 13) if "202310" <= f"{y}{m:02d}" <= "202511"]
+
+EMP_COLUMNS = [
+    "agency_code", "agency", "agency_subelement_code", "agency_subelement",
+    "occupational_series_code", "occupational_series", "occupational_group", "stem_occupation_type",
+    "duty_station_state_abbreviation", "duty_station_state", "duty_station_country",
+    "education_level", "age_bracket", "pay_plan_code", "grade", "annualized_adjusted_basic_pay",
+    "length_of_service_years", "supervisory_status", "appointment_type", "work_schedule", "count",
+]
+MONTHLY_COLUMNS = [
+    "personnel_action_effective_date_yyyymm", "agency_code", "agency", "agency_subelement_code", "agency_subelement",
+    "occupational_series_code", "occupational_series", "education_level", "age_bracket", "pay_plan_code", "grade",
+    "annualized_adjusted_basic_pay", "length_of_service_years", "supervisory_status", "count",
+]
+
+
+def redacted(rng, value, rate=0.05):
+    return "REDACTED" if rng.random() < rate else value
+
+
+def person(rng):
+    """Columns shared by every file: who the row is about."""
+    code, name = rng.choice(AGENCIES)
+    sub_code, sub = rng.choice(SUBELEMENTS[code])
+    occ = rng.choice(OCCUPATIONS)
+    los = rng.uniform(0, 40)
+    pay = 30000 + los * 2500 + rng.uniform(0, 60000)
+    return {
+        "agency_code": code, "agency": name, "agency_subelement_code": sub_code, "agency_subelement": sub,
+        "occupational_series_code": occ[0], "occupational_series": occ[1],
+        "occupational_group": occ[2], "stem_occupation_type": occ[3],
+        "education_level": rng.choice(EDUCATION), "age_bracket": rng.choice(AGES),
+        "pay_plan_code": rng.choice(PAY_PLANS), "grade": redacted(rng, f"{rng.randint(1, 15):02d}", 0.02),
+        "annualized_adjusted_basic_pay": redacted(rng, str(round(pay))),
+        "length_of_service_years": redacted(rng, f"{los:.1f}", 0.02),
+        "supervisory_status": rng.choice(SUPERVISORY),
+    }
+
+
+def write_rows(path, columns, rows, delim):
+    n = 0
+    with open(path, "w") as f:
+        f.write(delim.join(columns) + "\n")
+        for row in rows:
+            f.write(delim.join(str(row.get(c, "")) for c in columns) + "\n")
+            n += 1
+    return n
+
+
+def employment(rng, n):
+    for _ in range(n):
+        row = person(rng)
+        state = rng.choice(STATES)
+        row.update({
+            "duty_station_state_abbreviation": state[0], "duty_station_state": state[1],
+            "duty_station_country": "UNITED STATES", "appointment_type": "CAREER", "work_schedule": "FULL-TIME",
+            "count": rng.randint(1, 5),
+        })
+        yield row
+
+
+def bulk(rng, n, flow):
+    """SEPDATA/ACCDATA FY2020-2024 rows (comma-delimited, AGYSUB-coded)."""
+    for _ in range(n):
+        code, _ = rng.choice(AGENCIES)
+        yield {
+            "AGYSUB": rng.choice(SUBELEMENTS[code])[0],
+            flow: rng.choice(list(SEPARATIONS)) if flow == "SEP" else rng.choice(ACCESSIONS),
+            "EFDATE": rng.choice(OLD_MONTHS), "AGELVL": rng.choice("ABCDEFGHIJK"), "GSEGRD": f"{rng.randint(1, 15):02d}",
+            "COUNT": rng.randint(1, 4), "SALARY": "" if rng.random() < 0.05 else rng.randint(30000, 200000),
+            "LOS": f"{rng.uniform(0, 35):.1f}",
+        }
+
+
+def monthly(rng, n, month, flow):
+    for _ in range(n):
+        row = person(rng)
+        row.update({"personnel_action_effective_date_yyyymm": month, "count": rng.randint(1, 3)})
+        if flow == "separations":
+            sep = rng.choice(list(SEPARATIONS))
+            row.update({"separation_category_code": sep, "separation_category": SEPARATIONS[sep]})
+        else:
+            row.update({"accession_category_code": rng.choice(ACCESSIONS)})
+        yield row
+
+
+def december(rng, n, flow):
+    """separations-/accessions-dec2025.json: newline-delimited JSON."""
+    for _ in range(n):
+        code, name = rng.choice(AGENCIES)
+        row = {"personnel_action_effective_date_yyyymm": "202512", "agency_code": code, "agency": name,
+               "count": str(rng.randint(1, 3))}
+        if flow == "separations":
+            row["separation_category_code"] = rng.choice(list(SEPARATIONS))
+        yield row
+
+
+def generate(home, scale=1, seed=0):
+    """Write every raw input under home; returns {relative path: rows}."""
+    rng = random.Random(seed)
+    extracted, monthly_dir = f"{home}/{ROOT_DATA}/extracted", f"{home}/{ROOT_DATA}/monthly"
+    for path in (extracted, monthly_dir, f"{home}/{ROOT_OUT}"):
+        os.makedirs(path, exist_ok=True)
+    rows = {}
+
+    def record(path, n):
+        rows[os.path.relpath(path, home)] = n
+
+    path = f"{extracted}/employment-dec2025.txt"
+    record(path, write_rows(path, EMP_COLUMNS, employment(rng, EMP_ROWS * scale), "|"))
+    for flow, name in (("SEP", "SEPDATA"), ("ACC", "ACCDATA")):
+        path = f"{extracted}/{name}_FY2020-2024.TXT"
+        columns = ["AGYSUB", flow, "EFDATE", "AGELVL", "GSEGRD", "COUNT", "SALARY", "LOS"]
+        record(path, write_rows(path, columns, bulk(rng, OLD_ROWS * scale, flow), ","))
+
+    path = f"{extracted}/DTagy.txt"
+    agy = ({"AGYTYP": "1", "AGYTYPT": "Cabinet Level Agencies", "AGY": code, "AGYT": f'"{name}"',
+            "AGYSUB": sub, "AGYSUBT": f'"{sub_name}"'}
+           for code, name in AGENCIES for sub, sub_name in SUBELEMENTS[code])
+    record(path, write_rows(path, ["AGYTYP", "AGYTYPT", "AGY", "AGYT", "AGYSUB", "AGYSUBT"], agy, ","))
+
+    for flow, extra in (("separations", ["separation_category_code", "separation_category"]),
+                        ("accessions", ["accession_category_code"])):
+        for month in MONTHLY_MONTHS:
+            path = f"{monthly_dir}/{flow}_{month}.txt"
+            record(path, write_rows(path, MONTHLY_COLUMNS + extra, monthly(rng, MONTHLY_ROWS * scale, month, flow), "|"))
+        path = f"{extracted}/{flow}-dec2025.json"
+        with open(path, "w") as f:
+            n = 0
+            for row in december(rng, DEC_ROWS * scale, flow):
+                f.write(json.dumps(row) + "\n")
+                n += 1
+        record(path, n)
+
+    with open(f"{home}/{MANIFEST}", "w") as f:
+        json.dump({"scale": scale, "seed": seed, "rows": rows}, f, indent=2)
+    return rows
+
+
+def load(home, scale=1, seed=0):
+    """The fixture under home, generating it unless it already matches scale/seed."""
+    try:
+        with open(f"{home}/{MANIFEST}") as f:
+            manifest = json.load(f)
+        if (manifest["scale"], manifest["seed"]) == (scale, seed):
+            return manifest["rows"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return generate(home, scale, seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("home", help="directory to treat as $HOME")
+    parser.add_argument("--scale", type=int, default=1, help="multiple of the scale-1 row counts")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rows = generate(args.home, args.scale, args.seed)
+    print(f"  {len(rows)} files, {sum(rows.values()):,} rows -> {args.home}")
+
+
+if __name__ == "__main__":
+    main()
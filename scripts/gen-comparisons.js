@@ -1,9 +1,11 @@
 #!/usr/bin/env node
 /**
- * Generate agency comparison JSON files.
+ * Generate the list of curated agency comparisons.
  * Reads public/data/agency-risk.json and produces:
- *   - public/data/comparisons/[slug].json  (one per matchup)
- *   - public/data/comparisons/index.json   (summary list)
+ *   - public/data/comparisons/index.json   (slug, title, codes and names per matchup)
+ *
+ * The comparisons themselves are computed on request by src/lib/compare.ts
+ * from public/data/agency-features.json, for these slugs and any other pair.
  */
 
 const fs = require("fs");
@@ -182,17 +184,10 @@ for (const { slug, codes } of MATCHUPS) {
   const name2 = cleanAgencyName(raw2.name);
   const title = `${shortName(name1)} vs ${shortName(name2)}`;
 
-  const agency1 = { ...raw1, name: name1 };
-  const agency2 = { ...raw2, name: name2 };
-
-  const comparison = { slug, title, agency1, agency2 };
-
-  const outPath = path.join(outDir, `${slug}.json`);
-  fs.writeFileSync(outPath, JSON.stringify(comparison, null, 2));
-
   index.push({
     slug,
     title,
+    codes,
     agency1Name: name1,
     agency2Name: name2,
   });
@@ -201,4 +196,9 @@ for (const { slug, codes } of MATCHUPS) {
 const indexPath = path.join(outDir, "index.json");
 fs.writeFileSync(indexPath, JSON.stringify(index, null, 2));
 
-console.log(`✓ Generated ${index.length} comparison files in public/data/comparisons/`);
+// Per-matchup files from before comparisons were computed on request
+for (const file of fs.readdirSync(outDir)) {
+  if (file !== "index.json") fs.unlinkSync(path.join(outDir, file));
+}
+
+console.log(`✓ Listed ${index.length} comparisons in public/data/comparisons/index.json`);
@@ -1,34 +1,20 @@
 #!/usr/bin/env python3
 """Generate per-agency stats from December 2025 employment data."""
-import duckdb, json, os
+import os
 
-DATA = os.path.expanduser("~/Projects/fedtracker-data/extracted")
-EMP = f"{DATA}/employment-dec2025.txt"
-OUT = os.path.expanduser("~/Projects/fedtracker-app/public/data")
+from fedtracker_pipeline import OUT, FanOut, file_sha256, get_connection, percentiles, stage, write_bytes, write_json
 
-def title_case(s):
-    if not s: return s
-    small = {'of','the','and','for','in','on','at','to','by'}
-    words = s.split()
-    result = []
-    for i, w in enumerate(words):
-        if i > 0 and w.lower() in small:
-            result.append(w.lower())
-        else:
-            result.append(w.capitalize())
-    return ' '.join(result)
-
-con = duckdb.connect()
+con = get_connection()
 
 # Agency list with totals
-print("Generating agency list...")
+stage("Generating agency list")
 agencies = con.execute(f"""
     SELECT agency_code as code, agency as name,
-           SUM(CAST(count AS INT)) as employees,
-           ROUND(SUM(CAST(annualized_adjusted_basic_pay AS DOUBLE) * CAST(count AS INT)) / 
-                 NULLIF(SUM(CAST(count AS INT)), 0)) as avg_salary
-    FROM read_csv('{EMP}', delim='|', header=true, all_varchar=true)
-    WHERE annualized_adjusted_basic_pay != 'REDACTED'
+           SUM(count) as employees,
+           ROUND(SUM(annualized_adjusted_basic_pay * count) / 
+                 NULLIF(SUM(count), 0)) as avg_salary
+    FROM emp
+    WHERE annualized_adjusted_basic_pay IS NOT NULL
     GROUP BY agency_code, agency
     ORDER BY employees DESC
 """).fetchall()
@@ -37,15 +23,15 @@ agency_list = []
 for code, name, employees, avg_salary in agencies:
     agency_list.append({
         "code": code,
-        "name": title_case(name),
+        "name": name,
         "employees": int(employees),
         "avgSalary": int(avg_salary) if avg_salary else 0
     })
 
 # Also get total employees (including redacted salary rows)
 all_agencies = con.execute(f"""
-    SELECT agency_code as code, SUM(CAST(count AS INT)) as employees
-    FROM read_csv('{EMP}', delim='|', header=true, all_varchar=true)
+    SELECT agency_code as code, SUM(count) as employees
+    FROM emp
     GROUP BY agency_code
 """).fetchall()
 all_emp_map = {r[0]: int(r[1]) for r in all_agencies}
@@ -58,45 +44,82 @@ for a in agency_list:
 # Sort by updated employees
 agency_list.sort(key=lambda x: x["employees"], reverse=True)
 
-with open(f"{OUT}/agency-list.json", "w") as f:
-    json.dump(agency_list, f)
+write_json(f"{OUT}/agency-list.json", agency_list, compress=True)
 print(f"  {len(agency_list)} agencies")
 
-# Per-agency detail files
+# Per-agency detail files: one grouped scan for every agency's breakdowns,
+# ranked per (agency, breakdown) and fanned out in Python.
+stage("Per-agency breakdowns")
+rows = con.execute("""
+    WITH g AS (
+        SELECT agency_code,
+               CASE WHEN GROUPING(occupational_series) = 0 THEN 'occ'
+                    WHEN GROUPING(duty_station_state_abbreviation) = 0 THEN 'state'
+                    ELSE 'edu' END as dim,
+               occupational_series, duty_station_state, duty_station_state_abbreviation, education_level,
+               SUM(count) as cnt,
+               SUM(count) FILTER (WHERE annualized_adjusted_basic_pay IS NOT NULL) as paid,
+               ROUND(SUM(annualized_adjusted_basic_pay * count) /
+                     NULLIF(SUM(count) FILTER (WHERE annualized_adjusted_basic_pay IS NOT NULL), 0)) as avg_salary
+        FROM emp
+        GROUP BY GROUPING SETS (
+            (agency_code, occupational_series),
+            (agency_code, duty_station_state, duty_station_state_abbreviation),
+            (agency_code, education_level)
+        )
+    ), ranked AS (
+        SELECT *, ROW_NUMBER() OVER (
+                   PARTITION BY agency_code, dim
+                   ORDER BY CASE WHEN dim = 'occ' THEN paid ELSE cnt END DESC,
+                            occupational_series, duty_station_state_abbreviation, education_level) as rn
+        FROM g
+        WHERE (dim = 'occ' AND paid IS NOT NULL)
+           OR (dim = 'state' AND duty_station_state_abbreviation != 'REDACTED')
+           OR dim = 'edu'
+    )
+    SELECT agency_code, dim, occupational_series, duty_station_state, duty_station_state_abbreviation,
+           education_level, cnt, paid, avg_salary
+    FROM ranked
+    WHERE dim = 'edu' OR rn <= 15
+    ORDER BY agency_code, dim, rn
+""").fetchall()
+
+breakdowns = {}
+for code, dim, occ, state, state_code, edu, cnt, paid, avg_salary in rows:
+    b = breakdowns.setdefault(code, {"occ": [], "state": [], "edu": []})
+    if dim == "occ":
+        b["occ"].append({"name": occ, "count": int(paid), "avgSalary": int(avg_salary) if avg_salary else 0})
+    elif dim == "state":
+        b["state"].append({"name": state, "code": state_code, "count": int(cnt)})
+    else:
+        b["edu"].append({"level": edu, "count": int(cnt)})
+
+# Count-weighted salary percentiles (percentiles.py)
+salary_pct = percentiles(con, "agency")
+
 os.makedirs(f"{OUT}/agencies", exist_ok=True)
-for agency in agency_list[:300]:
-    code = agency["code"]
-    
-    occs = con.execute(f"""
-        SELECT occupational_series as name, SUM(CAST(count AS INT)) as cnt,
-               ROUND(SUM(CAST(annualized_adjusted_basic_pay AS DOUBLE) * CAST(count AS INT)) / NULLIF(SUM(CAST(count AS INT)), 0)) as avg_salary
-        FROM read_csv('{EMP}', delim='|', header=true, all_varchar=true)
-        WHERE agency_code = '{code}' AND annualized_adjusted_basic_pay != 'REDACTED'
-        GROUP BY occupational_series ORDER BY cnt DESC LIMIT 15
-    """).fetchall()
-    
-    states = con.execute(f"""
-        SELECT duty_station_state as name, duty_station_state_abbreviation as code, SUM(CAST(count AS INT)) as cnt
-        FROM read_csv('{EMP}', delim='|', header=true, all_varchar=true)
-        WHERE agency_code = '{code}' AND duty_station_state_abbreviation != 'REDACTED'
-        GROUP BY duty_station_state, duty_station_state_abbreviation ORDER BY cnt DESC LIMIT 15
-    """).fetchall()
-    
-    edu = con.execute(f"""
-        SELECT education_level as level, SUM(CAST(count AS INT)) as cnt
-        FROM read_csv('{EMP}', delim='|', header=true, all_varchar=true)
-        WHERE agency_code = '{code}'
-        GROUP BY education_level ORDER BY cnt DESC
-    """).fetchall()
-    
-    detail = {
-        **agency,
-        "topOccupations": [{"name": title_case(r[0]), "count": int(r[1]), "avgSalary": int(r[2]) if r[2] else 0} for r in occs],
-        "topStates": [{"name": title_case(r[0]), "code": r[1], "count": int(r[2])} for r in states],
-        "education": [{"level": title_case(r[0]), "count": int(r[1])} for r in edu],
-    }
-    
-    with open(f"{OUT}/agencies/{code}.json", "w") as f:
-        json.dump(detail, f)
+index = []
+with FanOut() as out:
+    for agency in agency_list[:300]:
+        code = agency["code"]
+        b = breakdowns.get(code, {"occ": [], "state": [], "edu": []})
+        detail = {
+            **agency,
+            "salaryPercentiles": salary_pct.get(code),
+            "topOccupations": b["occ"],
+            "topStates": b["state"],
+            "education": b["edu"],
+        }
+        out.write(f"{OUT}/agencies/{code}.json", detail)
+        index.append({"code": code, "name": agency["name"], "employees": agency["employees"],
+                      "avgSalary": agency["avgSalary"], "topOccupations": b["occ"][:10]})
+print(f"  agencies/: {out.written} written, {out.unchanged} unchanged")
+
+# Prebuilt /api/agency-list payload (code order, as the route's readdir returned
+# it), with its sha256 alongside for the ETag
+index.sort(key=lambda a: a["code"])
+write_json(f"{OUT}/agency-index.json", index, compress=True)
+write_bytes(f"{OUT}/agency-index.sha256", file_sha256(f"{OUT}/agency-index.json").encode())
+print(f"  agency-index.json: {len(index)} agencies")
 
 print("Done gen1")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Generate embed/ for /api/embed/[type]: one ready-to-serve HTML page per chart.
+
+    embed/{type}.html     the full response body
+    embed/{type}.sha256   its content hash, the route's ETag
+
+Labels are formatted and bar widths and chart coordinates computed here, so the
+route only looks the bytes up. A chart whose source file is missing is skipped.
+"""
+import hashlib
+import html
+import json
+import math
+import os
+
+from fedtracker_pipeline import OUT, stage, title_case, write_bytes
+
+out_dir = f"{OUT}/embed"
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="UTF-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  <title>{title} — OpenFeds</title>
+  <style>
+    * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+    body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: #fff; color: #1f2937; padding: 20px; position: relative; min-height: 100vh; }}
+    h2 {{ font-size: 18px; font-weight: 700; margin-bottom: 16px; color: #111827; }}
+    .watermark {{ position: fixed; bottom: 8px; right: 12px; font-size: 11px; color: #9ca3af; text-decoration: none; }}
+    .watermark:hover {{ color: #4F46E5; }}
+    .bar-row {{ display: flex; align-items: center; margin-bottom: 6px; font-size: 12px; }}
+    .bar-label {{ width: 220px; text-align: right; padding-right: 10px; overflow: hidden; text-overflow: ellipsis; white-space: nowrap; color: #374151; flex-shrink: 0; }}
+    .bar-container {{ flex: 1; height: 22px; background: #f3f4f6; border-radius: 4px; overflow: hidden; position: relative; }}
+    .bar-fill {{ height: 100%; background: #4F46E5; border-radius: 4px; transition: width 0.3s; }}
+    .bar-value {{ position: absolute; right: 6px; top: 50%; transform: translateY(-50%); font-size: 11px; color: #6b7280; }}
+    @media (max-width: 600px) {{
+      .bar-label {{ width: 140px; font-size: 11px; }}
+      .bar-row {{ margin-bottom: 4px; }}
+    }}
+  </style>
+</head>
+<body>
+  {body}
+  <a href="https://openfeds.org" target="_blank" rel="noopener" class="watermark">OpenFeds</a>
+</body>
+</html>"""
+
+
+def load(name):
+    with open(f"{OUT}/{name}") as f:
+        return json.load(f)
+
+
+def num(v):
+    """Coordinates as compact text: 60 not 60.0, at most one decimal."""
+    v = round(v, 1)
+    return str(int(v)) if v == int(v) else str(v)
+
+
+def month_label(m):
+    return f"{MONTHS[int(m[4:6]) - 1]} {m[:4]}"
+
+
+def bars(rows):
+    """rows of (label, value, display value) -> bar-row divs scaled to the largest value."""
+    top = max((value for _, value, _ in rows), default=0) or 1
+    return "".join(f"""<div class="bar-row">
+      <div class="bar-label" title="{html.escape(label)}">{html.escape(label)}</div>
+      <div class="bar-container">
+        <div class="bar-fill" style="width:{num(value / top * 100)}%"></div>
+        <span class="bar-value">{shown}</span>
+      </div>
+    </div>""" for label, value, shown in rows)
+
+
+def doge_timeline():
+    data = load("doge-timeline.json")
+    top = max(d["separations"] for d in data) or 1
+    width, height = 800, 300
+    left, right, top_pad, bottom = 60, 20, 20, 40
+    chart_w, chart_h = width - left - right, height - top_pad - bottom
+    base = top_pad + chart_h
+    points = [(left + i / max(len(data) - 1, 1) * chart_w, base - d["separations"] / top * chart_h, d["month"])
+              for i, d in enumerate(data)]
+    line = " ".join(f"{'M' if i == 0 else 'L'}{num(x)},{num(y)}" for i, (x, y, _) in enumerate(points))
+    area = f"{line} L{num(points[-1][0])},{num(base)} L{num(points[0][0])},{num(base)} Z"
+    ticks = []
+    for share in (0, 0.25, 0.5, 0.75, 1):
+        val = round(top * share)
+        y = base - share * chart_h
+        text = f"{math.floor(val / 1000 + 0.5)}K" if val >= 1000 else str(val)
+        ticks.append(f'<line x1="{left}" y1="{num(y)}" x2="{width - right}" y2="{num(y)}" stroke="#e5e7eb" />'
+                     f'<text x="{left - 8}" y="{num(y + 4)}" text-anchor="end" font-size="11" fill="#6b7280">{text}</text>')
+    # Every sixth month is labelled
+    labels = "".join(f'<text x="{num(x)}" y="{base + 20}" text-anchor="middle" font-size="10" fill="#6b7280">'
+                     f'{month_label(m)}</text>' for x, _, m in points[::6])
+    svg = f"""<svg viewBox="0 0 {width} {height}" style="width:100%;max-width:{width}px;height:auto;">
+    {"".join(ticks)}
+    <path d="{area}" fill="#4F46E5" fill-opacity="0.15" />
+    <path d="{line}" fill="none" stroke="#4F46E5" stroke-width="2" />
+    {labels}
+  </svg>"""
+    return "DOGE Timeline — Monthly Separations", f"<h2>Monthly Federal Separations</h2>{svg}"
+
+
+def risk_scores():
+    data = load("agency-risk.json")[:20]
+    rows = [(d["name"], d["riskScore"], d["riskScore"]) for d in data]
+    return "Agency Risk Scores", f"<h2>Top 20 Agency Risk Scores</h2>{bars(rows)}"
+
+
+def state_impact():
+    data = [d for d in load("state-impact.json") if d["state"] not in ("NO DATA REPORTED", "INVALID")][:15]
+    rows = [(title_case(d["state"]), d["seps2025"], f"{d['seps2025']:,}") for d in data]
+    return "State Impact — Job Losses", f"<h2>Top 15 States by 2025 Separations</h2>{bars(rows)}"
+
+
+# type -> (source file in OUT, renderer)
+EMBEDS = {
+    "doge-timeline": ("doge-timeline.json", doge_timeline),
+    "risk-scores": ("agency-risk.json", risk_scores),
+    "state-impact": ("state-impact.json", state_impact),
+}
+
+stage("Embeds")
+os.makedirs(out_dir, exist_ok=True)
+built = []
+for name, (source, render) in EMBEDS.items():
+    if not os.path.exists(f"{OUT}/{source}"):
+        print(f"  {name}: skipped, no {source}")
+        continue
+    title, body = render()
+    page = PAGE.format(title=title, body=body).encode()
+    write_bytes(f"{out_dir}/{name}.html", page)
+    write_bytes(f"{out_dir}/{name}.sha256", hashlib.sha256(page).hexdigest().encode())
+    built.append(f"{name} ({len(page):,} bytes)")
+
+print(f"  {', '.join(built) or 'no embeds'}")
+print("Done gen10")
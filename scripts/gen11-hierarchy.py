@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Generate the agency hierarchy: agency type -> agency -> subagency, all levels from one pass.
+
+    agency-hierarchy.json          every agency type with its agencies' totals
+    subagencies.json               subagencies with more than 100 employees, largest first
+    agency-subagencies/{code}.json one agency's totals and all of its subagencies
+
+Agencies and subagencies are numbered once (agency codes from the employment
+file and DTagy, subagency codes from the employment file, DTagy and the monthly
+files' subelements), and every employment and separation row is mapped to those
+integers before a single GROUP BY ROLLUP (type, agency, subagency) computes the
+totals of every level at once. Names are joined back only to the result.
+Separations are the spliced series: bulk AGYSUBs through SPLICE_MONTH, the
+monthly files' subelements after it.
+"""
+import os
+
+from fedtracker_pipeline import OUT, RIF, SPLICE_MONTH, FanOut, get_connection, normalize, stage, write_json
+
+con = get_connection()
+out_dir = f"{OUT}/agency-subagencies"
+# subagencies.json lists subagencies with more than this many employees;
+# agency-subagencies/ has them all
+MIN_EMPLOYEES = 100
+YEARS = ("2024", "2025")
+
+stage("Integer codes")
+# AGYTYP is DTagy's agency type code ("1" Cabinet Level Agencies, ...); 0 when unknown
+con.execute("""
+    CREATE OR REPLACE TEMP TABLE agency_codes AS
+    WITH names AS (
+        SELECT agency_code, agency, 0 as pref FROM emp GROUP BY ALL
+        UNION ALL
+        SELECT AGY, AGYT, 1 FROM agy
+    ),
+    types AS (
+        SELECT AGY, min(TRY_CAST(AGYTYP AS INTEGER)) as type_id FROM agy GROUP BY AGY
+    )
+    SELECT CAST(row_number() OVER (ORDER BY n.agency_code) AS INTEGER) as agy_id, n.agency_code,
+           n.agency, COALESCE(t.type_id, 0) as type_id
+    FROM (SELECT agency_code, arg_min(agency, pref) as agency FROM names
+          WHERE agency_code IS NOT NULL AND agency_code != '' GROUP BY agency_code) n
+    LEFT JOIN types t ON n.agency_code = t.AGY
+""")
+con.execute("""
+    CREATE OR REPLACE TEMP TABLE type_names AS
+    SELECT CAST(TRY_CAST(AGYTYP AS INTEGER) AS INTEGER) as type_id, min(AGYTYPT) as name
+    FROM agy WHERE TRY_CAST(AGYTYP AS INTEGER) IS NOT NULL GROUP BY ALL
+""")
+# A subagency belongs to the agency of its code's first two characters unless
+# the employment file or DTagy says otherwise
+con.execute(f"""
+    CREATE OR REPLACE TEMP TABLE sub_codes AS
+    WITH subs AS (
+        SELECT agency_subelement_code as agysub, agency_code, agency_subelement as name, 0 as pref
+        FROM emp GROUP BY ALL
+        UNION ALL
+        SELECT AGYSUB, AGY, AGYSUBT, 1 FROM agy
+        UNION ALL
+        SELECT value, left(value, 2), label, 2 FROM profile
+        WHERE dim = 'subelement' AND flow = 'sep' AND month > '{SPLICE_MONTH}' GROUP BY ALL
+    ),
+    picked AS (
+        SELECT agysub, arg_min(agency_code, pref) as agency_code, arg_min(name, pref) as name
+        FROM subs WHERE agysub NOT IN ('', 'REDACTED', '*') GROUP BY agysub
+    )
+    SELECT CAST(row_number() OVER (ORDER BY p.agysub) AS INTEGER) as sub_id, p.agysub, p.name, a.agy_id, a.type_id
+    FROM picked p JOIN agency_codes a USING (agency_code)
+""")
+# DTagy's "XX-NAME" titles; the employment and monthly names are canonical already
+normalize(con, "agency_codes", {"agency": "agency"})
+normalize(con, "sub_codes", {"name": "agency"})
+
+stage("Hierarchy rollup")
+year_sums = ", ".join(
+    f"SUM(seps) FILTER (WHERE year = '{y}') as seps{y}" for y in YEARS
+)
+rows = con.execute(f"""
+    WITH facts AS (
+        SELECT a.agy_id, s.sub_id, e.count as employees,
+               e.annualized_adjusted_basic_pay * e.count as salary_sum,
+               CASE WHEN e.annualized_adjusted_basic_pay IS NOT NULL THEN e.count END as salary_cnt,
+               NULL as year, 0 as seps, 0 as rifs
+        FROM emp e
+        JOIN agency_codes a ON e.agency_code = a.agency_code
+        LEFT JOIN sub_codes s ON e.agency_subelement_code = s.agysub
+        UNION ALL
+        SELECT s.agy_id, s.sub_id, 0, NULL, NULL, substr(o.month, 1, 4), o.cnt,
+               CASE WHEN o.sep = '{RIF}' THEN o.cnt ELSE 0 END
+        FROM old_seps o JOIN sub_codes s ON o.agysub = s.agysub
+        WHERE o.month <= '{SPLICE_MONTH}' AND list_contains($years, substr(o.month, 1, 4))
+        UNION ALL
+        SELECT s.agy_id, s.sub_id, 0, NULL, NULL, substr(p.month, 1, 4), p.cnt,
+               CASE WHEN p.sep = '{RIF}' THEN p.cnt ELSE 0 END
+        FROM profile p JOIN sub_codes s ON p.value = s.agysub
+        WHERE p.flow = 'sep' AND p.dim = 'subelement' AND p.month > '{SPLICE_MONTH}'
+          AND list_contains($years, substr(p.month, 1, 4))
+    )
+    SELECT GROUPING(a.type_id, f.agy_id, f.sub_id) as level, a.type_id, f.agy_id, f.sub_id,
+           SUM(employees), round(SUM(salary_sum) / SUM(salary_cnt)), {year_sums},
+           SUM(rifs) FILTER (WHERE year = '{YEARS[-1]}')
+    FROM facts f JOIN agency_codes a USING (agy_id)
+    GROUP BY ROLLUP (a.type_id, f.agy_id, f.sub_id)
+""", {"years": list(YEARS)}).fetchall()
+
+agencies = {i: (code, name) for i, code, name in con.execute(
+    "SELECT agy_id, agency_code, agency FROM agency_codes").fetchall()}
+subs = {i: (code, name) for i, code, name in con.execute("SELECT sub_id, agysub, name FROM sub_codes").fetchall()}
+type_names = dict(con.execute("SELECT type_id, name FROM type_names").fetchall())
+
+
+def totals(row):
+    employees, salary, *seps, rifs = row[4:]
+    return {"employees": int(employees or 0), "avgSalary": int(salary or 0),
+            **{f"seps{y}": int(n or 0) for y, n in zip(YEARS, seps)}, f"rifs{YEARS[-1]}": int(rifs or 0)}
+
+
+# GROUPING bits (type, agency, subagency): 0b000 subagency, 0b001 agency, 0b011 type, 0b111 total
+by_level = {0b000: [], 0b001: [], 0b011: [], 0b111: []}
+for row in rows:
+    by_level[row[0]].append(row)
+
+children = {}
+for row in by_level[0b000]:
+    # Employment rows without a subelement code are in their agency's total only
+    if row[3] is None:
+        continue
+    code, name = subs[row[3]]
+    children.setdefault(row[2], []).append({"code": code, "name": name, **totals(row)})
+for items in children.values():
+    items.sort(key=lambda s: (-s["employees"], -s[f"seps{YEARS[-1]}"], s["code"]))
+
+stage("Writing hierarchy")
+agency_rows = {}
+for row in by_level[0b001]:
+    code, name = agencies[row[2]]
+    agency_rows.setdefault(row[1], []).append(
+        {"code": code, "name": name, **totals(row), "subagencies": len(children.get(row[2], []))})
+hierarchy = {
+    **totals(by_level[0b111][0]),
+    "types": sorted(({
+        "type": row[1],
+        "name": type_names.get(row[1], "Other Agencies"),
+        **totals(row),
+        "agencies": sorted(agency_rows.get(row[1], []), key=lambda a: (-a["employees"], a["code"])),
+    } for row in by_level[0b011]), key=lambda t: (t["type"] == 0, t["type"])),
+}
+write_json(f"{OUT}/agency-hierarchy.json", hierarchy, compress=True)
+
+subagencies = sorted(({**s, "parentCode": agencies[agy_id][0], "parentName": agencies[agy_id][1]}
+                      for agy_id, items in children.items() for s in items if s["employees"] > MIN_EMPLOYEES),
+                     key=lambda s: (-s["employees"], s["code"]))
+write_json(f"{OUT}/subagencies.json", subagencies, compress=True)
+
+# Drop the files (and .gz/.br siblings) of agencies that no longer have subagencies
+codes = {agencies[row[2]][0] for row in by_level[0b001] if row[2] in children}
+removed = 0
+if os.path.isdir(out_dir):
+    for fn in os.listdir(out_dir):
+        if fn.split(".")[0] not in codes:
+            os.remove(os.path.join(out_dir, fn))
+            removed += 1
+os.makedirs(out_dir, exist_ok=True)
+with FanOut() as out:
+    for row in by_level[0b001]:
+        if row[2] not in children:
+            continue
+        code, name = agencies[row[2]]
+        out.write(f"{out_dir}/{code}.json", {"parentCode": code, "parentName": name, **totals(row),
+                                             "subagencies": children[row[2]]})
+
+print(f"  {len(by_level[0b011])} agency types, {len(by_level[0b001])} agencies, "
+      f"{sum(len(c) for c in children.values())} subagencies ({len(subagencies)} with over {MIN_EMPLOYEES} employees); "
+      f"{out.written} files written, {out.unchanged} unchanged, {removed} removed")
+print("Done gen11")
@@ -1,90 +1,79 @@
 #!/usr/bin/env python3
 """Generate salary stats from December 2025 employment data."""
-import duckdb, json, os
 
-DATA = os.path.expanduser("~/Projects/fedtracker-data/extracted")
-EMP = f"{DATA}/employment-dec2025.txt"
-OUT = os.path.expanduser("~/Projects/fedtracker-app/public/data")
+from fedtracker_pipeline import OUT, get_connection, percentiles, stage, write_json
 
-def title_case(s):
-    if not s: return s
-    small = {'of','the','and','for','in','on','at','to','by'}
-    words = s.split()
-    result = []
-    for i, w in enumerate(words):
-        if i > 0 and w.lower() in small:
-            result.append(w.lower())
-        else:
-            result.append(w.capitalize())
-    return ' '.join(result)
+con = get_connection()
 
-con = duckdb.connect()
+SALARY_FILTER = "annualized_adjusted_basic_pay IS NOT NULL"
+SALARY = "annualized_adjusted_basic_pay"
 
-SALARY_FILTER = "annualized_adjusted_basic_pay != 'REDACTED'"
-SALARY_CAST = "CAST(annualized_adjusted_basic_pay AS DOUBLE)"
-
-print("Salary distribution...")
+stage("Salary distribution")
 buckets = con.execute(f"""
     SELECT 
         CASE 
-            WHEN {SALARY_CAST} < 30000 THEN 'Under $30K'
-            WHEN {SALARY_CAST} < 50000 THEN '$30K-$50K'
-            WHEN {SALARY_CAST} < 75000 THEN '$50K-$75K'
-            WHEN {SALARY_CAST} < 100000 THEN '$75K-$100K'
-            WHEN {SALARY_CAST} < 125000 THEN '$100K-$125K'
-            WHEN {SALARY_CAST} < 150000 THEN '$125K-$150K'
-            WHEN {SALARY_CAST} < 200000 THEN '$150K-$200K'
+            WHEN {SALARY} < 30000 THEN 'Under $30K'
+            WHEN {SALARY} < 50000 THEN '$30K-$50K'
+            WHEN {SALARY} < 75000 THEN '$50K-$75K'
+            WHEN {SALARY} < 100000 THEN '$75K-$100K'
+            WHEN {SALARY} < 125000 THEN '$100K-$125K'
+            WHEN {SALARY} < 150000 THEN '$125K-$150K'
+            WHEN {SALARY} < 200000 THEN '$150K-$200K'
             ELSE '$200K+'
         END as bracket,
-        SUM(CAST(count AS INT)) as employees
-    FROM read_csv('{EMP}', delim='|', header=true, all_varchar=true)
+        SUM(count) as employees
+    FROM emp
     WHERE {SALARY_FILTER}
     GROUP BY bracket
 """).fetchall()
 
-print("Top paid agencies...")
+stage("Top paid agencies")
 top_paid = con.execute(f"""
     SELECT agency_code, agency,
-           ROUND(SUM({SALARY_CAST} * CAST(count AS INT)) / NULLIF(SUM(CAST(count AS INT)), 0)) as avg_salary,
-           SUM(CAST(count AS INT)) as employees
-    FROM read_csv('{EMP}', delim='|', header=true, all_varchar=true)
+           ROUND(SUM({SALARY} * count) / NULLIF(SUM(count), 0)) as avg_salary,
+           SUM(count) as employees
+    FROM emp
     WHERE {SALARY_FILTER}
     GROUP BY agency_code, agency
     HAVING employees > 100
     ORDER BY avg_salary DESC LIMIT 20
 """).fetchall()
 
-print("Top paid occupations...")
+stage("Top paid occupations")
 top_occ_paid = con.execute(f"""
     SELECT occupational_series_code, occupational_series,
-           ROUND(SUM({SALARY_CAST} * CAST(count AS INT)) / NULLIF(SUM(CAST(count AS INT)), 0)) as avg_salary,
-           SUM(CAST(count AS INT)) as employees
-    FROM read_csv('{EMP}', delim='|', header=true, all_varchar=true)
+           ROUND(SUM({SALARY} * count) / NULLIF(SUM(count), 0)) as avg_salary,
+           SUM(count) as employees
+    FROM emp
     WHERE {SALARY_FILTER}
     GROUP BY occupational_series_code, occupational_series
     HAVING employees > 50
     ORDER BY avg_salary DESC LIMIT 20
 """).fetchall()
 
-print("By grade...")
+stage("By grade")
 by_grade = con.execute(f"""
     SELECT grade,
-           ROUND(SUM({SALARY_CAST} * CAST(count AS INT)) / NULLIF(SUM(CAST(count AS INT)), 0)) as avg_salary,
-           SUM(CAST(count AS INT)) as employees
-    FROM read_csv('{EMP}', delim='|', header=true, all_varchar=true)
+           ROUND(SUM({SALARY} * count) / NULLIF(SUM(count), 0)) as avg_salary,
+           SUM(count) as employees
+    FROM emp
     WHERE {SALARY_FILTER} AND grade != '' AND grade != '*'
     GROUP BY grade
     ORDER BY grade
 """).fetchall()
 
+# Count-weighted percentiles, workforce-wide and per grade (percentiles.py)
+grade_pct = percentiles(con, "grade")
+
 salary_stats = {
+    "percentiles": percentiles(con, "all").get(""),
     "distribution": [{"bracket": r[0], "employees": int(r[1])} for r in buckets],
-    "topPaidAgencies": [{"code": r[0], "name": title_case(r[1]), "avgSalary": int(r[2]), "employees": int(r[3])} for r in top_paid],
-    "topPaidOccupations": [{"code": r[0], "name": title_case(r[1]), "avgSalary": int(r[2]), "employees": int(r[3])} for r in top_occ_paid],
-    "byGrade": [{"grade": r[0], "avgSalary": int(r[1]), "employees": int(r[2])} for r in by_grade],
+    "topPaidAgencies": [{"code": r[0], "name": r[1], "avgSalary": int(r[2]), "employees": int(r[3])} for r in top_paid],
+    "topPaidOccupations": [{"code": r[0], "name": r[1], "avgSalary": int(r[2]), "employees": int(r[3])} for r in top_occ_paid],
+    "byGrade": [{"grade": r[0], "avgSalary": int(r[1]), "employees": int(r[2]), "salaryPercentiles": grade_pct.get(r[0])}
+                for r in by_grade],
 }
 
-with open(f"{OUT}/salary-stats.json", "w") as f:
-    json.dump(salary_stats, f)
+write_json(f"{OUT}/salary-stats.json", salary_stats, compress=True)
 
 print("Done gen5")
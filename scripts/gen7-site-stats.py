@@ -1,67 +1,40 @@
 #!/usr/bin/env python3
 """Generate homepage site stats."""
-import duckdb, json, os
+import json
 
-DATA = os.path.expanduser("~/Projects/fedtracker-data/extracted")
-EMP = f"{DATA}/employment-dec2025.txt"
-OUT = os.path.expanduser("~/Projects/fedtracker-app/public/data")
+from fedtracker_pipeline import OUT, QUIT, get_connection, stage, write_json
 
-def title_case(s):
-    if not s: return s
-    small = {'of','the','and','for','in','on','at','to','by'}
-    words = s.split()
-    result = []
-    for i, w in enumerate(words):
-        if i > 0 and w.lower() in small:
-            result.append(w.lower())
-        else:
-            result.append(w.capitalize())
-    return ' '.join(result)
+con = get_connection()
 
-con = duckdb.connect()
-
-print("Site stats...")
-emp_stats = con.execute(f"""
-    SELECT SUM(CAST(count AS INT)) as total_employees,
-           ROUND(SUM(CASE WHEN annualized_adjusted_basic_pay != 'REDACTED' 
-                      THEN CAST(annualized_adjusted_basic_pay AS DOUBLE) * CAST(count AS INT) END) / 
-                 NULLIF(SUM(CASE WHEN annualized_adjusted_basic_pay != 'REDACTED' THEN CAST(count AS INT) END), 0)) as avg_salary,
+stage("Site stats")
+emp_stats = con.execute("""
+    SELECT SUM(count) as total_employees,
+           ROUND(SUM(annualized_adjusted_basic_pay * count) / 
+                 NULLIF(SUM(CASE WHEN annualized_adjusted_basic_pay IS NOT NULL THEN count END), 0)) as avg_salary,
            COUNT(DISTINCT agency_code) as agency_count
-    FROM read_csv('{EMP}', delim='|', header=true, all_varchar=true)
+    FROM emp
 """).fetchone()
 
-# Total seps = old + new
-sep_old = con.execute(f"""
-    SELECT SUM(CAST(COUNT AS INT)) FROM read_csv('{DATA}/SEPDATA_FY2020-2024.TXT', header=true, all_varchar=true)
-""").fetchone()[0]
-sep_new = con.execute(f"""
-    SELECT SUM(CAST(count AS INT)) FROM read_json_auto('{DATA}/separations-dec2025.json', format='newline_delimited')
-""").fetchone()[0]
-
-acc_old = con.execute(f"""
-    SELECT SUM(CAST(COUNT AS INT)) FROM read_csv('{DATA}/ACCDATA_FY2020-2024.TXT', header=true, all_varchar=true)
-""").fetchone()[0]
-acc_new = con.execute(f"""
-    SELECT SUM(CAST(count AS INT)) FROM read_json_auto('{DATA}/accessions-dec2025.json', format='newline_delimited')
-""").fetchone()[0]
+# Total seps/accs = old + new
+sep_old, sep_new, acc_old, acc_new = con.execute("""
+    SELECT SUM(cnt) FILTER (WHERE flow = 'sep' AND source = 'old'),
+           SUM(cnt) FILTER (WHERE flow = 'sep' AND source = 'dec'),
+           SUM(cnt) FILTER (WHERE flow = 'acc' AND source = 'old'),
+           SUM(cnt) FILTER (WHERE flow = 'acc' AND source = 'dec')
+    FROM cube
+""").fetchone()
 
 # Load rif-top from already-generated file
 rif_top = json.load(open(f"{OUT}/rif-top.json"))
 
 # Top quit rate agencies
-con.execute(f"""
-CREATE VIEW agy AS
-SELECT DISTINCT AGYSUB, AGY, AGYT FROM read_csv('{DATA}/DTagy.txt', header=true, all_varchar=true)
-""")
-
 quit_rates = con.execute(f"""
-    SELECT a.AGY, a.AGYT,
-           SUM(CASE WHEN s.SEP = 'SC' THEN CAST(s.COUNT AS INT) ELSE 0 END) as quits,
-           SUM(CAST(s.COUNT AS INT)) as total_seps
-    FROM read_csv('{DATA}/SEPDATA_FY2020-2024.TXT', header=true, all_varchar=true) s
-    LEFT JOIN agy a ON s.AGYSUB = a.AGYSUB
-    WHERE a.AGY IS NOT NULL
-    GROUP BY a.AGY, a.AGYT
+    SELECT agency_code, agency,
+           SUM(CASE WHEN sep = '{QUIT}' THEN cnt ELSE 0 END) as quits,
+           SUM(cnt) as total_seps
+    FROM cube
+    WHERE flow = 'sep' AND source = 'old' AND agency_code IS NOT NULL
+    GROUP BY agency_code, agency
     HAVING total_seps > 500
     ORDER BY (quits * 1.0 / total_seps) DESC LIMIT 10
 """).fetchall()
@@ -73,12 +46,11 @@ site_stats = {
     "totalSeparations": int(sep_old) + int(sep_new),
     "totalAccessions": int(acc_old) + int(acc_new),
     "topRifAgencies": rif_top[:10],
-    "topQuitRates": [{"code": r[0], "name": title_case(r[1]), "quits": int(r[2]), "totalSeps": int(r[3]),
+    "topQuitRates": [{"code": r[0], "name": r[1], "quits": int(r[2]), "totalSeps": int(r[3]),
                        "quitRate": round(int(r[2]) / int(r[3]) * 100, 1)} for r in quit_rates],
 }
 
-with open(f"{OUT}/site-stats.json", "w") as f:
-    json.dump(site_stats, f)
+write_json(f"{OUT}/site-stats.json", site_stats, compress=True)
 
 print(f"  Total employees: {site_stats['totalEmployees']:,}")
 print(f"  Avg salary: ${site_stats['avgSalary']:,}")
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""Generate the workforce-risk analytics (agency-risk, retirement, brain drain, tenure, who's leaving, grade shift).
+
+One GROUPING SETS pass over December 2025 employment; separations and accessions
+come from the monthly partials and profile breakdowns ingest already aggregated.
+agency-features.json puts each agency's numbers in one row for src/lib/compare.ts,
+which compares any two agencies on request.
+"""
+
+import calendar
+
+from fedtracker_pipeline import (
+    OUT, QUANTILES, QUIT, RETIREMENTS, RIF, SEP_TYPES, TERMINATION, get_connection, percentiles, risk_score, stage,
+    write_json,
+)
+
+con = get_connection()
+
+NEAR_RETIREMENT = "age_bracket IN ('55-59', '60-64', '65 OR MORE')"
+# Immediate retirement (MRA+30, 60+20, 62+5), approximated by the age brackets
+ELIGIBLE = """(age_bracket = '55-59' AND length_of_service_years >= 30)
+    OR (age_bracket = '60-64' AND length_of_service_years >= 20)
+    OR (age_bracket = '65 OR MORE' AND length_of_service_years >= 5)"""
+STEM = "stem_occupation_type != '' AND stem_occupation_type != 'ALL OTHER OCCUPATIONS'"
+SKIP = ("", "REDACTED", "*")
+GRADES = tuple(f"{g:02d}" for g in range(1, 16))
+
+# GROUPING(agency_code, age_bracket, occupational_series_code, grade, tenure) -> breakdown
+EMP_SETS = {
+    0b01111: "agency",
+    0b00111: "agency_age",
+    0b11011: "occupation",
+    0b10111: "age",
+    0b11101: "grade",
+    0b11110: "tenure",
+    0b11111: "total",
+}
+
+
+def avg(total, n, digits=1):
+    return round(total / n, digits) if n else 0
+
+
+def pct(part, whole):
+    return round(part / whole * 100, 1) if whole else 0
+
+
+stage("Employment profile")
+emp = {name: [] for name in EMP_SETS.values()}
+for row in con.execute(f"""
+    SELECT GROUPING(agency_code, age_bracket, occupational_series_code, grade, tenure),
+           agency_code, agency, age_bracket, occupational_series_code, occupational_series,
+           grade, pay_plan_code, tenure,
+           SUM(count),
+           SUM(count) FILTER (WHERE {NEAR_RETIREMENT}),
+           SUM(count) FILTER (WHERE {ELIGIBLE}),
+           SUM(count) FILTER (WHERE {STEM}),
+           SUM(annualized_adjusted_basic_pay * count),
+           SUM(count) FILTER (WHERE annualized_adjusted_basic_pay IS NOT NULL),
+           SUM(length_of_service_years * count),
+           SUM(count) FILTER (WHERE length_of_service_years IS NOT NULL)
+    FROM (SELECT *, ROUND(length_of_service_years, 1) as tenure FROM emp)
+    GROUP BY GROUPING SETS (
+        (agency_code, agency), (agency_code, agency, age_bracket),
+        (occupational_series_code, occupational_series), (age_bracket),
+        (grade, pay_plan_code), (tenure), ()
+    )
+""").fetchall():
+    g, *keys = row[:9]
+    employees, near, eligible, stem, sal_sum, sal_cnt, los_sum, los_cnt = (v or 0 for v in row[9:])
+    emp[EMP_SETS[g]].append({
+        "keys": keys, "employees": employees, "near": near, "eligible": eligible, "stem": stem,
+        "salary": avg(sal_sum, sal_cnt, None), "los": avg(los_sum, los_cnt),
+    })
+
+stage("Separations by agency")
+seps = {}
+for code, year, sep, cnt, los_sum in con.execute("""
+    SELECT agency_code, substr(month, 1, 4) as year, sep, SUM(cnt), SUM(los_sum)
+    FROM new_seps
+    WHERE substr(month, 1, 4) IN ('2024', '2025')
+    GROUP BY ALL
+""").fetchall():
+    s = seps.setdefault(code, {"2024": 0, "2025": 0, "by_sep": {}, "los": 0})
+    s[year] += cnt
+    if year == "2025":
+        s["by_sep"][sep] = s["by_sep"].get(sep, 0) + cnt
+        s["los"] += los_sum or 0
+
+stage("Agency risk")
+agency_risk = []
+for a in emp["agency"]:
+    code, name = a["keys"][0], a["keys"][1]
+    employees = a["employees"]
+    if not employees:
+        continue
+    s = seps.get(code, {"2024": 0, "2025": 0, "by_sep": {}, "los": 0})
+    s25, s24 = s["2025"], s["2024"]
+    rif = s["by_sep"].get(RIF, 0)
+    quits = s["by_sep"].get(QUIT, 0)
+    reduction = pct(s25, employees)
+    sep_change = pct(s25 - s24, s24)
+    retirement_pct = pct(a["near"], employees)
+    quit_rate = pct(quits, s25)
+    row = {
+        "code": code,
+        "name": name,
+        "employees": employees,
+        "avgSalary": round(a["salary"]),
+        "retirementPct": retirement_pct,
+        "retirementEligible": a["near"],
+        "stemPct": pct(a["stem"], employees),
+        "avgTenure": a["los"],
+        "riskScore": None,  # from the rounded fields below (risk_score)
+        "seps2025": s25,
+        "seps2024": s24,
+        "sepChange": sep_change,
+        "rifCount": rif,
+        "quitCount": quits,
+        "quitRate": quit_rate,
+        "retirementCount": sum(s["by_sep"].get(c, 0) for c in RETIREMENTS),
+        "terminationCount": s["by_sep"].get(TERMINATION, 0),
+        "reductionPct": reduction,
+        "experienceLostYears": round(s["los"]),
+    }
+    row["riskScore"] = risk_score(row)
+    agency_risk.append(row)
+agency_risk.sort(key=lambda x: -x["riskScore"])
+
+stage("Retirement cliff")
+ages = {}
+for a in emp["agency_age"]:
+    if a["keys"][2] not in SKIP:
+        ages.setdefault(a["keys"][0], {})[a["keys"][2]] = a["employees"]
+retirement_cliff = [{
+    "code": a["keys"][0],
+    "name": a["keys"][1],
+    "total": a["employees"],
+    "near_retirement": a["near"],
+    "pct_near_retirement": pct(a["near"], a["employees"]),
+    "age_distribution": dict(sorted(ages.get(a["keys"][0], {}).items())),
+} for a in emp["agency"] if a["employees"] >= 100]
+retirement_cliff.sort(key=lambda x: -x["pct_near_retirement"])
+
+stage("Agency features")
+# One row per agency: agency-risk's metrics, salary quantiles, then 2025
+# separations by type and employees by age bracket as percentages
+METRICS = ["employees", "avgSalary", "avgTenure", "retirementPct", "stemPct", "riskScore", "seps2025",
+           "seps2024", "sepChange", "rifCount", "quitRate", "reductionPct", "experienceLostYears"]
+AGE_BRACKETS = sorted({b for mix in ages.values() for b in mix})
+salary_pct = percentiles(con, "agency")
+features = [*METRICS, *(f"salary:{q}" for q in QUANTILES),
+            *(f"sep:{c}" for c in SEP_TYPES), *(f"age:{b}" for b in AGE_BRACKETS)]
+feature_rows = []
+for r in sorted(agency_risk, key=lambda x: x["code"]):
+    code = r["code"]
+    by_sep = seps.get(code, {"by_sep": {}})["by_sep"]
+    age_mix = ages.get(code, {})
+    quantiles = salary_pct.get(code) or {}
+    feature_rows.append([
+        code, r["name"],
+        *(r[m] for m in METRICS),
+        *(quantiles.get(q) for q in QUANTILES),
+        *(pct(by_sep.get(c, 0), r["seps2025"]) for c in SEP_TYPES),
+        *(pct(age_mix.get(b, 0), sum(age_mix.values())) for b in AGE_BRACKETS),
+    ])
+agency_features = {"features": features, "labels": {f"sep:{c}": name for c, (name, _) in SEP_TYPES.items()},
+                   "agencies": feature_rows}
+
+stage("Retirement risk")
+total = emp["total"][0]
+by_agency = [{
+    "code": a["keys"][0],
+    "name": a["keys"][1],
+    "eligible": a["eligible"],
+    "total": a["employees"],
+    "pctEligible": pct(a["eligible"], a["employees"]),
+} for a in emp["agency"] if a["employees"] >= 100]
+by_occupation = [{
+    "code": o["keys"][3],
+    "name": o["keys"][4],
+    "eligible": o["eligible"],
+    "total": o["employees"],
+    "pctEligible": pct(o["eligible"], o["employees"]),
+} for o in emp["occupation"] if o["employees"] >= 500]
+retirement_risk = {
+    "totalEmployees": total["employees"],
+    "totalEligible": total["eligible"],
+    "pctEligible": pct(total["eligible"], total["employees"]),
+    "byAgency": sorted(by_agency, key=lambda x: -x["pctEligible"]),
+    "byOccupation": sorted(by_occupation, key=lambda x: -x["pctEligible"])[:20],
+    "ageDistribution": sorted(
+        ({"bracket": a["keys"][2], "count": a["employees"]} for a in emp["age"] if a["keys"][2] not in SKIP),
+        key=lambda x: x["bracket"]),
+}
+
+stage("Tenure distribution")
+tenure = sorted(
+    ({"years": t["keys"][7], "employees": t["employees"]} for t in emp["tenure"] if t["keys"][7] is not None),
+    key=lambda x: x["years"])
+
+stage("Brain drain")
+
+
+def profile(flow, dim, years=None):
+    """(value, label, count, avg salary, avg LOS) rows of one profile breakdown."""
+    where = f"AND substr(month, 1, 4) IN ({', '.join(repr(y) for y in years)})" if years else ""
+    return con.execute(f"""
+        SELECT value, ANY_VALUE(label), SUM(cnt),
+               SUM(salary_sum) / NULLIF(SUM(salary_cnt), 0), SUM(los_sum) / NULLIF(SUM(los_cnt), 0)
+        FROM profile
+        WHERE flow = ? AND dim = ? {where}
+        GROUP BY value
+        ORDER BY SUM(cnt) DESC, value
+    """, [flow, dim]).fetchall()
+
+
+def by_grade(flow, salary_digits):
+    return [{
+        "grade": grade,
+        "count": cnt,
+        "avg_salary": round(salary or 0, salary_digits),
+        "avg_los": round(los or 0, 1),
+    } for grade, _, cnt, salary, los in profile(flow, "grade") if grade in GRADES]
+
+
+sep_sub = {r[0]: r for r in profile("sep", "subelement") if r[0] not in SKIP}
+acc_sub = {r[0]: r for r in profile("acc", "subelement") if r[0] not in SKIP}
+agency_brain_drain = []
+for code, (_, label, sep_cnt, sep_salary, sep_los) in sep_sub.items():
+    if sep_cnt < 100 or code not in acc_sub:
+        continue
+    _, _, acc_cnt, acc_salary, acc_los = acc_sub[code]
+    sep_salary, sep_los, acc_salary, acc_los = (round(v or 0, d) for v, d in
+                                                ((sep_salary, None), (sep_los, 1), (acc_salary, None), (acc_los, 1)))
+    agency_brain_drain.append({
+        "code": code,
+        "sep_count": sep_cnt,
+        "avg_sep_salary": sep_salary,
+        "avg_sep_los": sep_los,
+        "acc_count": acc_cnt,
+        "avg_acc_salary": acc_salary,
+        "avg_acc_los": acc_los,
+        "salary_gap": sep_salary - acc_salary,
+        "experience_gap": round(sep_los - acc_los, 1),
+        "name": label,
+    })
+agency_brain_drain.sort(key=lambda x: -x["salary_gap"])
+brain_drain = {
+    "separations_by_grade": by_grade("sep", None),
+    "accessions_by_grade": by_grade("acc", None),
+    "agency_brain_drain": agency_brain_drain,
+}
+
+stage("Grade shift")
+current = sorted(
+    ({"grade": g["keys"][5], "employees": g["employees"], "pay_plan": g["keys"][6]}
+     for g in emp["grade"] if g["keys"][5] not in SKIP),
+    key=lambda x: -x["employees"])[:50]
+grade_shift = {
+    "current_distribution": current,
+    "separations_by_grade": by_grade("sep", 0),
+    "accessions_by_grade": by_grade("acc", 0),
+}
+
+stage("Who's leaving")
+
+
+def leaving(year):
+    breakdowns = {}
+    for key, dim in [("byAge", "age"), ("byEducation", "education"), ("byLOS", "los"),
+                     ("byGrade", "grade"), ("bySupervisory", "supervisory")]:
+        breakdowns[key] = [{"label": value, "count": cnt}
+                           for value, _, cnt, _, _ in profile("sep", dim, [year]) if value not in SKIP]
+    breakdowns["topOccupations"] = [{"name": name, "count": cnt} for name, cnt in con.execute("""
+        SELECT occupational_series, SUM(cnt) as cnt
+        FROM new_seps
+        WHERE substr(month, 1, 4) = ? AND occupational_series NOT IN ('', 'REDACTED')
+        GROUP BY occupational_series
+        ORDER BY cnt DESC, occupational_series LIMIT 20
+    """, [year]).fetchall()]
+    breakdowns["total"] = con.execute(
+        "SELECT COALESCE(SUM(cnt), 0) FROM new_seps WHERE substr(month, 1, 4) = ?", [year]).fetchone()[0]
+    return breakdowns
+
+
+year2025, year2024 = leaving("2025"), leaving("2024")
+first, last = (calendar.month_abbr[int(m[4:])] for m in con.execute(
+    "SELECT MIN(month), MAX(month) FROM new_seps WHERE month LIKE '2025%'").fetchone())
+whos_leaving = {
+    "year2025": year2025,
+    "year2024": year2024,
+    "comparison": {
+        "total2025": year2025["total"],
+        "total2024": year2024["total"],
+        "note": f"2025 data covers {first}-{last}; 2024 covers full year",
+    },
+}
+
+for name, obj in [("agency-risk", agency_risk), ("retirement-cliff", retirement_cliff),
+                  ("retirement-risk", retirement_risk), ("brain-drain", brain_drain),
+                  ("tenure-distribution", tenure), ("whos-leaving", whos_leaving),
+                  ("grade-shift", grade_shift)]:
+    write_json(f"{OUT}/{name}.json", obj, compress=True)
+write_json(f"{OUT}/agency-features.json", agency_features, compress=True)
+print(f"  {len(agency_risk)} agencies, {len(agency_brain_drain)} subelements, {len(tenure)} tenure buckets")
+print("Done gen8")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Generate search/ for HomeSearch from agency-list.json, occupations.json and states.json.
+
+    search/docs.json   {"types": [...], "docs": [[label, type, code], ...], "shards": [...]}
+    search/{c}.json    {key: [doc id, ...]} for every key starting with c
+
+Docs are numbered by popularity (employees, largest first), so every posting
+list, kept in id order, is already ranked. Labels are normalized (lower case,
+accents and punctuation dropped) and split into tokens, with the entity's code
+(VA, 0610, TX) as one more token; each token is posted
+under its 1- and 2-letter prefixes and under every trigram it contains. A query
+token shorter than three letters is a prefix lookup; a longer one intersects
+its trigrams' lists, which finds it anywhere in a word. The client fetches
+docs.json once and only the shards its query's keys fall in.
+"""
+import json
+import os
+import re
+import unicodedata
+from collections import defaultdict
+
+from fedtracker_pipeline import OUT, agency_name, stage, write_json
+
+TYPES = ["Agency", "Occupation", "State"]
+out_dir = f"{OUT}/search"
+
+
+def normalize(label):
+    text = unicodedata.normalize("NFKD", label).encode("ascii", "ignore").decode().lower()
+    return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+
+def keys(token):
+    """Posting keys of one token: its 1- and 2-letter prefixes and its trigrams."""
+    found = {token[:1], token[:2]}
+    found.update(token[i:i + 3] for i in range(len(token) - 2))
+    return found
+
+
+def shard(key):
+    return key[0] if key[0].isalnum() else "_"
+
+
+def load(name):
+    with open(f"{OUT}/{name}") as f:
+        return json.load(f)
+
+
+stage("Search documents")
+# agency-list.json keeps OPM's truncated names ("Department of Treasury") where
+# it was generated before names were canonicalized; the index ships canonical ones
+items = (
+    [(agency_name(a["name"]), 0, a["code"], a.get("employees", 0)) for a in load("agency-list.json") if a["code"] != "*"]
+    + [(o["name"], 1, o["code"], o.get("employees", 0)) for o in load("occupations.json") if o["code"] != "*"]
+    + [(s["name"], 2, s["code"], s.get("employees", 0))
+       for s in load("states.json") if s["code"] not in ("*", "NDR")]
+)
+items = [i for i in items if i[0]]
+items.sort(key=lambda i: (-i[3], i[0]))
+docs = [[label, kind, code] for label, kind, code, _ in items]
+
+stage("Postings")
+postings = defaultdict(set)
+for doc_id, (label, _, code, _) in enumerate(items):
+    for token in normalize(f"{label} {code}").split():
+        for key in keys(token):
+            postings[key].add(doc_id)
+
+shards = defaultdict(dict)
+for key in sorted(postings):
+    shards[shard(key)][key] = sorted(postings[key])
+
+# Drop shards whose letter no longer occurs
+if os.path.isdir(out_dir):
+    for fn in os.listdir(out_dir):
+        if fn.split(".")[0] not in shards and fn.split(".")[0] != "docs":
+            os.remove(os.path.join(out_dir, fn))
+os.makedirs(out_dir, exist_ok=True)
+for name, shard_postings in shards.items():
+    write_json(f"{out_dir}/{name}.json", shard_postings, compress=True)
+write_json(f"{out_dir}/docs.json", {"types": TYPES, "docs": docs, "shards": sorted(shards)}, compress=True)
+
+print(f"  {len(docs)} documents, {len(postings)} keys in {len(shards)} shards")
+print("Done gen9")
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""Incrementally ingest separations/accessions into a persistent aggregate store.
+
+staged/flows.duckdb keeps per-file, per-month partial aggregates of the FY2020-2024
+bulk files and every monthly/separations_*.txt and accessions_*.txt. Each file is
+aggregated once; on later runs only new or changed files are (re)loaded, so a new
+monthly drop costs one small file scan. Monthly files are read together, one
+multi-threaded scan per header, with each row's month taken from its file name.
+The separation generators (fix_separations, fix_agency_separations,
+fix_separation_types, gen_doge_impact) roll these partials up, through the views
+fedtracker_pipeline registers over this file, instead of re-reading the raw
+files. The same read of each monthly file also fills `profile`: per-dimension
+breakdowns (grade, age, education, LOS, supervisory status, subelement) with
+pay/LOS sums for gen8's analytics.
+"""
+import duckdb, functools, glob, os, sys
+from concurrent.futures import ThreadPoolExecutor
+
+from fedtracker_pipeline import (
+    ACC_MONTHLY, ACC_OLD, FLOWS, SEP_MONTHLY, SEP_OLD, STAGED, configure, count, fingerprint, normalize, span, stage, traced,
+)
+
+# Bump when the partial-aggregate layout changes; the store is then rebuilt from scratch.
+SCHEMA_VERSION = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key VARCHAR PRIMARY KEY, value VARCHAR);
+CREATE TABLE IF NOT EXISTS ingested (
+    path VARCHAR PRIMARY KEY, kind VARCHAR, source VARCHAR,
+    size BIGINT, mtime BIGINT, sha256 VARCHAR, rows BIGINT
+);
+CREATE TABLE IF NOT EXISTS seps (
+    source VARCHAR, file VARCHAR, month VARCHAR, agysub VARCHAR,
+    agency_code VARCHAR, agency VARCHAR, sep VARCHAR, sep_name VARCHAR,
+    occupational_series VARCHAR, age_bracket VARCHAR,
+    cnt BIGINT, salary_sum DOUBLE, salary_cnt BIGINT, los_sum DOUBLE, los_cnt BIGINT
+);
+CREATE TABLE IF NOT EXISTS accs (
+    source VARCHAR, file VARCHAR, month VARCHAR, agysub VARCHAR,
+    agency_code VARCHAR, agency VARCHAR, cnt BIGINT
+);
+CREATE TABLE IF NOT EXISTS profile (
+    flow VARCHAR, file VARCHAR, month VARCHAR, sep VARCHAR, dim VARCHAR, value VARCHAR, label VARCHAR,
+    cnt BIGINT, salary_sum DOUBLE, salary_cnt BIGINT, los_sum DOUBLE, los_cnt BIGINT
+);
+"""
+
+# Monthly file columns, normalized: name -> (separations column, accessions column).
+# A column a file does not have reads as '' (text) or NULL (numbers).
+MONTHLY_TEXT = {
+    "agency_code": ("agency_code", "agency_code"),
+    "agency": ("agency", "agency"),
+    "subelement_code": ("agency_subelement_code", "agency_subelement_code"),
+    "subelement": ("agency_subelement", "agency_subelement"),
+    "sep": ("separation_category_code", None),
+    "sep_name": ("separation_category", None),
+    "occupational_series": ("occupational_series", "occupational_series"),
+    "age_bracket": ("age_bracket", "age_bracket"),
+    "education_level": ("education_level", "education_level"),
+    "grade": ("grade", "grade"),
+    "supervisory_status": ("supervisory_status", "supervisory_status"),
+}
+MONTHLY_NUMBERS = {
+    "salary": "annualized_adjusted_basic_pay",
+    "los": "length_of_service_years",
+}
+
+# Extra breakdowns of the monthly files for the workforce analytics (gen8): one
+# grouping set per dimension, dimension -> (value column, label column)
+PROFILE_DIMS = {
+    "seps": {
+        "grade": ("grade", None),
+        "age": ("age_bracket", None),
+        "education": ("education_level", None),
+        "los": ("los_bracket", None),
+        "supervisory": ("supervisory_status", None),
+        "subelement": ("subelement_code", "subelement"),
+    },
+    "accs": {
+        "grade": ("grade", None),
+        "subelement": ("subelement_code", "subelement"),
+    },
+}
+# Canonical names (fedtracker_pipeline.names), fixed once here for every generator
+MONTHLY_NAMES = {
+    "agency": "agency",
+    "subelement": "agency",
+    "occupational_series": "title",
+    "education_level": "title",
+    "supervisory_status": "title",
+}
+LOS_BRACKET = """
+    CASE WHEN los IS NULL THEN '' WHEN los < 1 THEN '<1 year' WHEN los < 5 THEN '1-4 years'
+         WHEN los < 10 THEN '5-9 years' WHEN los < 20 THEN '10-19 years'
+         WHEN los < 30 THEN '20-29 years' ELSE '30+ years' END
+"""
+
+
+def text(col):
+    # csv.DictReader + .strip() semantics: missing/blank fields are ''
+    return f"COALESCE(trim({col}), '')"
+
+
+def header(path):
+    """The column names on a monthly file's first line."""
+    with open(path, newline="") as f:
+        return tuple(f.readline().rstrip("\r\n").split("|"))
+
+
+@functools.lru_cache(maxsize=None)
+def monthly_columns(table, columns):
+    """SELECT list mapping a monthly header to the normalized columns (one per distinct header)."""
+    which = 0 if table == "seps" else 1
+    cols = []
+    for name, raw in MONTHLY_TEXT.items():
+        expr = text(raw[which]) if raw[which] in columns else "''"
+        cols.append(f"{expr} as {name}")
+    for name, raw in MONTHLY_NUMBERS.items():
+        expr = f"TRY_CAST(trim({raw}) AS DOUBLE)" if raw in columns else "CAST(NULL AS DOUBLE)"
+        cols.append(f"{expr} as {name}")
+    cols.append("CAST(trim(count) AS INTEGER) as cnt")
+    return ", ".join(cols)
+
+
+def load_monthly(con, table, paths, columns):
+    """Read monthly files sharing one header into the monthly_rows temp table in a single scan.
+
+    The header is known, so nothing is sniffed: DuckDB splits the files across
+    its threads and tags each row with its file; the month comes from the name.
+    """
+    files = ", ".join(f"'{p}'" for p in paths)
+    schema = ", ".join(f"'{c}': 'VARCHAR'" for c in columns)
+    reader = f"""read_csv([{files}], delim='|', header=true, auto_detect=false,
+                          columns={{{schema}}}, filename=true)"""
+    con.execute(f"""
+        CREATE OR REPLACE TEMP TABLE monthly_rows AS
+        SELECT filename as file, regexp_extract(filename, '_([0-9]{{6}})[.][^./]*$', 1) as month,
+               {monthly_columns(table, columns)}
+        FROM {reader}
+    """)
+    normalize(con, "monthly_rows", MONTHLY_NAMES)
+
+
+def sums():
+    return """SUM(cnt), SUM(salary * cnt), SUM(CASE WHEN salary IS NOT NULL THEN cnt END),
+              SUM(los * cnt), SUM(CASE WHEN los IS NOT NULL THEN cnt END)"""
+
+
+def profile_partials(table):
+    """monthly_rows per (file, sep, dimension value) for every PROFILE_DIMS entry, in one pass."""
+    dims = PROFILE_DIMS[table]
+
+    def case(pick):
+        return "CASE " + " ".join(f"WHEN GROUPING({v}) = 0 THEN {pick(d, v, l)}" for d, (v, l) in dims.items()) + " END"
+
+    sets = ", ".join(f"(file, month, sep, {v}, {l})" if l else f"(file, month, sep, {v})" for v, l in dims.values())
+    return f"""
+        SELECT '{table[:-1]}', file, month, sep,
+               {case(lambda d, v, l: f"'{d}'")}, {case(lambda d, v, l: v)}, {case(lambda d, v, l: l or "''")},
+               {sums()}
+        FROM (SELECT *, {LOS_BRACKET} as los_bracket FROM monthly_rows)
+        GROUP BY GROUPING SETS ({sets})
+    """
+
+
+def sep_partials(path, source):
+    if source == "old":
+        return f"""
+            SELECT 'old', '{path}', month, agysub, substr(agysub, 1, 2), '', sep, '', '', '',
+                   SUM(cnt), SUM(salary * cnt), SUM(CASE WHEN salary IS NOT NULL THEN cnt END),
+                   SUM(los * cnt), SUM(CASE WHEN los IS NOT NULL THEN cnt END)
+            FROM (
+                SELECT {text('EFDATE')} as month, {text('AGYSUB')} as agysub,
+                       {text('SEP')} as sep, CAST(trim(COUNT) AS INTEGER) as cnt,
+                       TRY_CAST(trim(SALARY) AS DOUBLE) as salary, TRY_CAST(trim(LOS) AS DOUBLE) as los
+                FROM read_csv('{path}', header=true, all_varchar=true)
+            )
+            GROUP BY ALL
+        """
+    return f"""
+        SELECT 'monthly', file, month, '', agency_code, agency, sep, sep_name,
+               occupational_series, age_bracket, {sums()}
+        FROM monthly_rows
+        GROUP BY ALL
+    """
+
+
+def acc_partials(path, source):
+    if source == "old":
+        return f"""
+            SELECT 'old', '{path}', {text('EFDATE')}, {text('AGYSUB')}, substr({text('AGYSUB')}, 1, 2), '',
+                   SUM(CAST(trim(COUNT) AS INTEGER))
+            FROM read_csv('{path}', header=true, all_varchar=true)
+            GROUP BY ALL
+        """
+    return f"""
+        SELECT 'monthly', file, month, '', agency_code, agency, SUM(cnt)
+        FROM monthly_rows
+        GROUP BY ALL
+    """
+
+
+def sources():
+    """(table, source, path) for every file that feeds the store."""
+    yield "seps", "old", SEP_OLD
+    yield "accs", "old", ACC_OLD
+    for path in sorted(glob.glob(SEP_MONTHLY)):
+        yield "seps", "monthly", path
+    for path in sorted(glob.glob(ACC_MONTHLY)):
+        yield "accs", "monthly", path
+
+
+def reset_if_outdated(con):
+    """Drop everything if the store was written with a different layout."""
+    try:
+        version = con.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+    except duckdb.CatalogException:
+        version = None
+    if version and version[0] == str(SCHEMA_VERSION):
+        return
+    for (name, kind) in con.execute("""
+        SELECT table_name, table_type FROM information_schema.tables WHERE table_catalog = current_database()
+    """).fetchall():
+        con.execute(f"DROP {'VIEW' if kind == 'VIEW' else 'TABLE'} IF EXISTS {name}")
+    con.execute(SCHEMA)
+    con.execute("INSERT INTO meta VALUES ('schema_version', ?)", [str(SCHEMA_VERSION)])
+
+
+def load(con, table, source, paths, fps, columns=None):
+    """Replace the partials of paths (the bulk file, or monthly files sharing a header) in one transaction."""
+    partials = sep_partials if table == "seps" else acc_partials
+    files = ", ".join(f"'{p}'" for p in paths)
+    name = os.path.basename(paths[0]) if len(paths) == 1 else f"{len(paths)} {table} files"
+    with span(name, "file"):
+        con.execute("BEGIN TRANSACTION")
+        con.execute(f"DELETE FROM {table} WHERE file IN ({files})")
+        con.execute(f"DELETE FROM profile WHERE file IN ({files})")
+        if source == "monthly":
+            # one read of the files feeds both the partials and the profile breakdowns
+            load_monthly(con, table, paths, columns)
+            con.execute(f"INSERT INTO profile {profile_partials(table)}")
+        con.execute(f"INSERT INTO {table} {partials(paths[0], source)}")
+        rows = dict(con.execute(f"SELECT file, COUNT(*) FROM {table} WHERE file IN ({files}) GROUP BY file").fetchall())
+        con.executemany("INSERT OR REPLACE INTO ingested VALUES (?, ?, ?, ?, ?, ?, ?)", [
+            [p, table, source, fps[p]["size"], fps[p]["mtime"], fps[p]["sha256"], rows.get(p, 0)] for p in paths
+        ])
+        con.execute("COMMIT")
+        count(rows=sum(rows.values()), bytes=sum(fps[p]["size"] for p in paths), files=len(paths))
+    for p in paths:
+        print(f"  {os.path.basename(p)}: {rows.get(p, 0):,} partial rows")
+
+
+def ingest(con, force=False):
+    """Load new/changed files, drop partials of files that disappeared. Returns #files loaded."""
+    reset_if_outdated(con)
+    known = {r[0]: {"size": r[1], "mtime": r[2], "sha256": r[3]}
+             for r in con.execute("SELECT path, size, mtime, sha256 FROM ingested").fetchall()}
+    files = list(sources())
+    # Hashing is I/O and releases the GIL: fingerprint the whole archive concurrently
+    with ThreadPoolExecutor() as pool:
+        fps = dict(zip([f[2] for f in files], pool.map(lambda f: fingerprint(f[2], known.get(f[2])), files)))
+
+    changed = []
+    for table, source, path in files:
+        prev, fp = known.get(path), fps[path]
+        if not force and prev and prev["sha256"] == fp["sha256"]:
+            if (prev["size"], prev["mtime"]) != (fp["size"], fp["mtime"]):
+                con.execute("UPDATE ingested SET size = ?, mtime = ? WHERE path = ?", [fp["size"], fp["mtime"], path])
+            continue
+        changed.append((table, source, path))
+
+    # The bulk files one at a time; monthly files in one scan per (table, header)
+    batches = {}
+    for table, source, path in changed:
+        if source == "old":
+            load(con, table, source, [path], fps)
+        else:
+            batches.setdefault((table, header(path)), []).append(path)
+    for (table, columns), paths in batches.items():
+        load(con, table, "monthly", paths, fps, columns)
+
+    for path in set(known) - set(fps):
+        print(f"  {os.path.basename(path)}: removed")
+        con.execute("DELETE FROM seps WHERE file = ?", [path])
+        con.execute("DELETE FROM accs WHERE file = ?", [path])
+        con.execute("DELETE FROM profile WHERE file = ?", [path])
+        con.execute("DELETE FROM ingested WHERE path = ?", [path])
+    return len(changed)
+
+
+def main(force=False):
+    os.makedirs(STAGED, exist_ok=True)
+    con = traced(configure(duckdb.connect(FLOWS)))
+    stage("Ingesting separations/accessions")
+    loaded = ingest(con, force)
+    months = con.execute("SELECT COUNT(DISTINCT month), MIN(month), MAX(month) FROM seps").fetchone()
+    print(f"  {loaded} files loaded; {months[0]} months, range {months[1]}-{months[2]}")
+    con.close()
+    print("Done ingest")
+
+
+if __name__ == "__main__":
+    main(force="--force" in sys.argv)
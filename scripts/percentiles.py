@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""Materialise count-weighted salary percentiles for every agency, occupation, state and grade.
+
+One scan of the staged employment rows (fedtracker_pipeline.quantiles) gives
+p10/p25/median/p75/p90 per key of each dimension, plus the whole workforce
+(dim 'all'). gen1, gen4, gen5 and fix_occupation_detail attach them to their
+files from the salary_percentiles view instead of each computing their own.
+"""
+import os
+
+from fedtracker_pipeline import PERCENTILES, get_connection, quantiles_sql, stage
+
+DIMENSIONS = {
+    "agency": "agency_code",
+    "occupation": "occupational_series_code",
+    "state": "duty_station_state_abbreviation",
+    "grade": "grade",
+}
+
+con = get_connection()
+
+stage("Weighted salary percentiles")
+tmp = f"{PERCENTILES}.tmp"
+con.execute(f"""
+    COPY ({quantiles_sql("emp", DIMENSIONS, "annualized_adjusted_basic_pay", "count")} ORDER BY dim, key)
+    TO '{tmp}' (FORMAT parquet, COMPRESSION zstd)
+""")
+os.replace(tmp, PERCENTILES)
+
+for dim, keys, median in con.execute(f"""
+    SELECT dim, COUNT(*), median(median) FROM read_parquet('{PERCENTILES}') GROUP BY dim ORDER BY dim
+""").fetchall():
+    print(f"  {dim}: {keys:,} keys (median of medians ${median:,.0f})")
+print("Done percentiles")
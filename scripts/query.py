@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Ad-hoc aggregates over the staged store, from the command line or a local HTTP API.
+
+    python3 query.py emp --by grade --where agency=VA state=CA --measures count avg_salary
+    python3 query.py seps --by year --where sep=SH agency=VA,HS
+    python3 query.py serve --port 8765
+
+The server keeps one warm DuckDB connection and fedtracker_pipeline.query's LRU
+cache for its lifetime. It listens on localhost only:
+
+    GET /sources                                  dimensions, filters and measures per source
+    GET /query/emp?by=grade&agency=VA&state=CA&measures=count,avg_salary&limit=20
+    GET /stats                                    result cache hits/misses
+
+Filter values are comma-separated lists; month_from/month_to bound months.
+"""
+import argparse, json, sys, time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from fedtracker_pipeline import QueryError, aggregate, instrument
+from fedtracker_pipeline.query import RANGES, SOURCES, cache_info
+
+
+def describe():
+    return {name: {"dimensions": list(dims), "measures": list(aggs),
+                   "ranges": [r for r, (dim, _) in RANGES.items() if dim in dims]}
+            for name, (_, dims, aggs, _) in SOURCES.items()}
+
+
+def run(source, by, where, measures, limit):
+    start = time.perf_counter()
+    hits = cache_info()["hits"]
+    rows = aggregate(source, by, where, measures, limit)
+    return {"source": source, "by": by, "where": where, "measures": measures, "rows": rows,
+            "cached": cache_info()["hits"] > hits, "seconds": round(time.perf_counter() - start, 4)}
+
+
+class Handler(BaseHTTPRequestHandler):
+    def send(self, status, body):
+        data = json.dumps(body, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/sources":
+            return self.send(200, describe())
+        if url.path == "/stats":
+            return self.send(200, cache_info())
+        if not url.path.startswith("/query/"):
+            return self.send(404, {"error": f"no such endpoint {url.path}"})
+        params = {k: ",".join(v).split(",") for k, v in parse_qs(url.query).items()}
+        by = params.pop("by", [])
+        measures = params.pop("measures", ["count"])
+        limit = params.pop("limit", [None])[0]
+        # Each request's query spans are dropped once it is answered, so a
+        # long-running server does not accumulate them
+        instrument.begin("query")
+        try:
+            self.send(200, run(url.path[len("/query/"):], by, params, measures, int(limit) if limit else None))
+        except (QueryError, ValueError) as e:
+            self.send(400, {"error": str(e)})
+        finally:
+            instrument.end()
+
+
+def serve(port):
+    # One request at a time: queries share one connection, and cache hits take microseconds
+    server = HTTPServer(("127.0.0.1", port), Handler)
+    print(f"Serving {', '.join(SOURCES)} on http://127.0.0.1:{port}/query/<source>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", choices=[*SOURCES, "serve"])
+    parser.add_argument("--by", nargs="*", default=[], help="dimensions to group by")
+    parser.add_argument("--where", nargs="*", default=[], metavar="NAME=V1,V2", help="filters")
+    parser.add_argument("--measures", nargs="*", default=["count"])
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    if args.source == "serve":
+        return serve(args.port)
+    where = {}
+    for item in args.where:
+        name, sep, values = item.partition("=")
+        if not sep:
+            parser.error(f"--where takes NAME=VALUE, not {item!r}")
+        where[name] = values.split(",")
+    try:
+        result = run(args.source, args.by, where, args.measures, args.limit)
+    except QueryError as e:
+        parser.error(str(e))
+    if args.json:
+        json.dump(result, sys.stdout, indent=2, default=str)
+        print()
+        return
+    columns = [*args.by, *args.measures]
+    print("\t".join(columns))
+    for row in result["rows"]:
+        print("\t".join("" if row[c] is None else str(row[c]) for c in columns))
+    print(f"{len(result['rows'])} rows in {result['seconds']}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
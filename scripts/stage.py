@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Stage raw FedScope drops into typed Parquet so generators never re-parse the CSVs.
+
+Run once after a new drop lands; re-running is a no-op while the raw files are
+unchanged (fingerprints are kept in staged/manifest.json). Agency, occupation,
+state and education names are canonicalized here (fedtracker_pipeline.names),
+so the generators ship them as they read them.
+"""
+import duckdb, json, os, sys
+
+from fedtracker_pipeline import EMP, EMP_RAW, STAGED, configure, count, fingerprint, normalize, stage, traced
+
+MANIFEST = f"{STAGED}/manifest.json"
+
+# Only the columns the generators read. Numeric columns are typed on the way in,
+# so REDACTED (and blanks) become NULL instead of being re-filtered in every query.
+EMP_TEXT = [
+    "agency_code", "agency", "agency_subelement_code", "agency_subelement",
+    "occupational_series_code", "occupational_series", "occupational_group",
+    "duty_station_state_abbreviation", "duty_station_state",
+    "education_level", "age_bracket", "pay_plan_code", "grade", "stem_occupation_type",
+]
+EMP_TYPED = {
+    "count": "INTEGER",
+    "annualized_adjusted_basic_pay": "DOUBLE",
+    "length_of_service_years": "DOUBLE",
+}
+EMP_NAMES = {
+    "agency": "agency",
+    "agency_subelement": "agency",
+    "occupational_series": "title",
+    "occupational_group": "title",
+    "duty_station_state": "title",
+    "education_level": "title",
+}
+
+SOURCES = {
+    "employment": {
+        "raw": EMP_RAW,
+        "parquet": EMP,
+        "read": "read_csv('{raw}', delim='|', header=true, all_varchar=true)",
+        "text": EMP_TEXT,
+        "typed": EMP_TYPED,
+        "names": EMP_NAMES,
+        "order": "agency_code, occupational_series_code",
+    },
+}
+
+
+def load_manifest():
+    if os.path.exists(MANIFEST):
+        with open(MANIFEST) as f:
+            return json.load(f)
+    return {}
+
+
+def stage_source(con, name, spec, out):
+    select = [f'"{c}"' for c in spec["text"]]
+    select += [f'TRY_CAST("{c}" AS {t}) AS "{c}"' for c, t in spec["typed"].items()]
+    source = spec["read"].format(raw=spec["raw"])
+    tmp = f"{out}.tmp"
+    con.execute(f"CREATE OR REPLACE TEMP TABLE staging AS SELECT {', '.join(select)} FROM {source}")
+    normalize(con, "staging", spec["names"])
+    con.execute(f"COPY (SELECT * FROM staging ORDER BY {spec['order']}) TO '{tmp}' (FORMAT parquet, COMPRESSION zstd)")
+    con.execute("DROP TABLE staging")
+    os.replace(tmp, out)
+    return con.execute(f"SELECT COUNT(*) FROM read_parquet('{out}')").fetchone()[0]
+
+
+def main(force=False):
+    os.makedirs(STAGED, exist_ok=True)
+    manifest = load_manifest()
+    con = traced(configure(duckdb.connect()))
+
+    for name, spec in SOURCES.items():
+        out = spec["parquet"]
+        prev = manifest.get(name, {})
+        fp = fingerprint(spec["raw"], prev.get("source"))
+        columns = spec["text"] + list(spec["typed"])
+        if (not force and os.path.exists(out) and prev.get("source", {}).get("sha256") == fp["sha256"]
+                and prev.get("columns") == columns and prev.get("names") == spec["names"]):
+            manifest[name]["source"] = fp
+            print(f"  {name}: unchanged, skipping")
+            continue
+        stage(f"Staging {name}")
+        rows = stage_source(con, name, spec, out)
+        count(rows=rows, bytes=os.path.getsize(out), files=1)
+        manifest[name] = {
+            "source": fp,
+            "parquet": out,
+            "rows": rows,
+            "columns": columns,
+            "names": spec["names"],
+        }
+        print(f"  {rows:,} rows -> {out} ({os.path.getsize(out):,} bytes)")
+
+    with open(MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=2)
+    print("Done staging")
+
+
+if __name__ == "__main__":
+    main(force="--force" in sys.argv)
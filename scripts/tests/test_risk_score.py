@@ -0,0 +1,16 @@
+"""gen8's riskScore reproduces the published public/data/agency-risk.json."""
+import json, os, sys
+
+SCRIPTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PUBLISHED = os.path.join(os.path.dirname(SCRIPTS), "public", "data", "agency-risk.json")
+sys.path.insert(0, SCRIPTS)
+
+from fedtracker_pipeline.risk import risk_score  # noqa: E402
+
+
+def test_published_scores():
+    with open(PUBLISHED) as f:
+        agencies = json.load(f)
+    assert len(agencies) > 100
+    off = [(a["code"], a["riskScore"], risk_score(a)) for a in agencies if abs(risk_score(a) - a["riskScore"]) > 1]
+    assert not off, f"{len(off)} agencies more than 1 point from the published score: {off[:10]}"
@@ -0,0 +1,108 @@
+"""The DuckDB separation generators against the original per-row scripts.
+
+tests/rowloop/ holds fix_separations.py, fix_agency_separations.py and
+fix_separation_types.py exactly as they were before they moved to DuckDB. Both
+versions run over the synthetic fixture (fixtures.py). Three differences are
+intended, so the row loop's output is brought into the new form before it is
+compared byte for byte:
+
+    names    agency and occupation names are canonical (ingest.py normalizes them)
+    format   JSON is compact (write_json)
+    ties     in separation-types' topAgencies and topOccupations, equal counts are
+             ordered by code/name; the row loop kept their first appearance in the
+             raw files, which the aggregate store does not record
+
+test_tie_order checks the last one on its own.
+"""
+import json, os, shutil, subprocess, sys
+
+import pytest
+
+SCRIPTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROWLOOP = os.path.join(SCRIPTS, "tests", "rowloop")
+OUTPUTS = ["separations.json", "agency-separations", "separation-types"]
+sys.path.insert(0, SCRIPTS)
+
+from fedtracker_pipeline.names import agency_name, title_case  # noqa: E402
+
+
+def run(home, script, *args):
+    env = {**os.environ, "HOME": str(home), "PYTHONPATH": SCRIPTS}
+    env.pop("FEDTRACKER_SERIES", None)
+    subprocess.run([sys.executable, script, *args], cwd=SCRIPTS, env=env, check=True, capture_output=True)
+
+
+def json_files(root):
+    return sorted(os.path.relpath(os.path.join(d, f), root)
+                  for d, _, files in os.walk(root) for f in files if f.endswith(".json"))
+
+
+def load(root, path):
+    with open(os.path.join(root, path), "rb") as f:
+        return f.read()
+
+
+@pytest.fixture(scope="module")
+def outputs(tmp_path_factory):
+    """(DuckDB output dir, row-loop output dir), both holding OUTPUTS."""
+    tmp = tmp_path_factory.mktemp("parity")
+    home = tmp / "home"
+    out = home / "Projects" / "fedtracker-app" / "public" / "data"
+    run(home, "fixtures.py", str(home))
+    run(home, "build.py", "--force", "--jobs", "1")
+
+    sql = tmp / "sql"
+    sql.mkdir()
+    for name in OUTPUTS:
+        if (out / name).is_dir():
+            shutil.copytree(out / name, sql / name)
+        else:
+            shutil.copy2(out / name, sql / name)
+    # agency-separations/ stays in place: the row loop reads its names from there
+    shutil.rmtree(out / "separation-types")
+    os.remove(out / "separations.json")
+    for script in ("fix_separations.py", "fix_agency_separations.py", "fix_separation_types.py"):
+        run(home, os.path.join(ROWLOOP, script))
+    return sql, out
+
+
+def canonical(name, code=None):
+    # A name that fell back to the agency code is not an OPM label
+    return name if name == code else agency_name(name)
+
+
+def new_form(path, obj):
+    """The row loop's output with canonical names and code/name tie order."""
+    if path.startswith("agency-separations"):
+        obj["name"] = canonical(obj["name"], obj["code"])
+    elif path.startswith("separation-types"):
+        for a in obj["topAgencies"]:
+            a["name"] = canonical(a["name"], a["code"])
+        for o in obj["topOccupations"]:
+            o["name"] = title_case(o["name"])
+        obj["topAgencies"].sort(key=lambda a: (-a["count"], a["code"]))
+        obj["topOccupations"].sort(key=lambda o: (-o["count"], o["name"]))
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def test_sql_matches_row_loop(outputs):
+    sql, rowloop = outputs
+    expected = json_files(sql)
+    assert any(p.startswith("agency-separations") for p in expected)
+    assert [p for p in json_files(rowloop) if p.split(os.sep)[0] in OUTPUTS] == expected
+    mismatched = [p for p in expected if load(sql, p) != new_form(p, json.loads(load(rowloop, p)))]
+    assert not mismatched, f"row loop and DuckDB outputs differ: {mismatched}"
+
+
+def test_tie_order(outputs):
+    sql, rowloop = outputs
+    for p in json_files(sql / "separation-types"):
+        new = json.loads(load(sql / "separation-types", p))
+        old = json.loads(load(rowloop / "separation-types", p))
+        for field, key, name in (("topAgencies", "code", str), ("topOccupations", "name", title_case)):
+            # DuckDB: largest first, equal counts by code/name
+            assert new[field] == sorted(new[field], key=lambda r: (-r["count"], r[key]))
+            # The row loop: the same rows, largest first, ties in first-appearance order
+            assert [r["count"] for r in old[field]] == [r["count"] for r in new[field]]
+            assert sorted((r["count"], name(r[key])) for r in old[field]) == \
+                sorted((r["count"], r[key]) for r in new[field])
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Check the staged employment file before anything is generated from it.
+
+Runs right after stage.py, as one scan of the staged Parquet, and fails the
+build before any employment generator runs when a new FedScope drop is malformed:
+
+    redacted          no employment column REDACTED/blank throughout, nor far
+                      more REDACTED/blank than in the previous run
+
+Every check's outcome is written to EMP_VALIDATION, with the column shares for
+the next run to compare against. The separations/accessions store is checked
+separately (validate_flows.py).
+"""
+from fedtracker_pipeline import EMP_VALIDATION, Checks, get_connection, stage
+
+# A column whose REDACTED/blank share jumps by more than this is an error
+REDACTED_JUMP = 0.2
+
+con = get_connection()
+checks = Checks(EMP_VALIDATION)
+
+stage("REDACTED shares")
+# Employment is one drop: compare each column with the previous run's share
+columns = [d[0] for d in con.execute("SELECT * EXCLUDE (count) FROM emp LIMIT 0").description]
+row = con.execute("""
+    SELECT SUM(count),
+           SUM(CASE WHEN COLUMNS(* EXCLUDE (count)) IS NULL
+                      OR CAST(COLUMNS(* EXCLUDE (count)) AS VARCHAR) IN ('REDACTED', '') THEN count END)
+    FROM emp
+""").fetchone()
+total = row[0] or 0
+shares = {c: round((n or 0) / total, 4) if total else 1.0 for c, n in zip(columns, row[1:])}
+previous = checks.previous("employment_redacted")
+bad = []
+for c, share in shares.items():
+    if share >= 1.0:
+        bad.append(("employment", c, None, share, previous.get(c)))
+    elif c in previous and share - previous[c] > REDACTED_JUMP:
+        bad.append(("employment", c, None, share, previous[c]))
+checks.check("redacted", bad, f"{len(bad)} columns with a REDACTED/blank share over {REDACTED_JUMP:.0%} above usual")
+
+# A failed drop does not become the baseline the next one is compared with
+checks.finish(employment_redacted=previous if bad and previous else shares)
+print("Done validate_employment")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Check the separations/accessions store before anything is generated from it.
+
+Runs right after ingest.py, as set-based queries over the aggregate store
+(seconds, whatever the drop size), and fails the build before any flows
+generator runs when a new FedScope drop is malformed:
+
+    month-format      every month is YYYYMM
+    month-continuity  no missing month inside any source's range, nor in the
+                      spliced series (bulk file through SPLICE_MONTH, monthly after)
+    splice            the bulk file reaches SPLICE_MONTH and the monthly files
+                      start by the month after it
+    duplicate-files   no two raw files with the same content (a drop saved twice)
+    sep-codes         only known separation codes (SEP_TYPES)
+    rif-code          the monthly files' Reduction in Force category is RIF
+    redacted          per column, no month far more REDACTED/blank than its usual share
+
+Bulk and monthly totals disagreeing in the months both cover is only a warning.
+Every check's outcome is written to FLOWS_VALIDATION. The employment file is
+checked separately (validate_employment.py), so a new monthly file does not
+re-run the employment generators.
+"""
+from fedtracker_pipeline import FLOWS_VALIDATION, RIF, SEP_TYPES, SPLICE_MONTH, Checks, get_connection, stage
+
+# A column/month whose REDACTED/blank share is this much above its usual share is an error
+REDACTED_JUMP = 0.2
+# Bulk vs monthly totals in the months both cover: relative difference that is warned about
+OVERLAP_TOLERANCE = 0.1
+
+con = get_connection()
+checks = Checks(FLOWS_VALIDATION)
+check = checks.check
+
+# Every (table, source, month) in the store
+con.execute("""
+    CREATE OR REPLACE TEMP TABLE store_months AS
+    SELECT 'seps' as tbl, source, month, SUM(cnt) as cnt FROM flows.seps GROUP BY ALL
+    UNION ALL
+    SELECT 'accs', source, month, SUM(cnt) FROM flows.accs GROUP BY ALL
+    UNION ALL
+    SELECT 'seps', 'spliced', month, SUM(cnt) FROM seps_spliced GROUP BY ALL
+""")
+
+stage("Months")
+bad = con.execute("""
+    SELECT tbl, source, month, cnt FROM store_months
+    WHERE NOT regexp_full_match(month, '\\d{4}(0[1-9]|1[0-2])')
+    ORDER BY ALL
+""").fetchall()
+check("month-format", bad, f"{len(bad)} months are not YYYYMM")
+
+if not bad:
+    gaps = con.execute("""
+        WITH ranges AS (
+            SELECT tbl, source, strptime(MIN(month), '%Y%m') as lo, strptime(MAX(month), '%Y%m') as hi
+            FROM store_months GROUP BY ALL
+        ),
+        expected AS (
+            SELECT tbl, source, strftime(unnest(generate_series(lo, hi, INTERVAL 1 MONTH)), '%Y%m') as month
+            FROM ranges
+        )
+        SELECT tbl, source, month FROM expected
+        ANTI JOIN store_months USING (tbl, source, month)
+        ORDER BY ALL
+    """).fetchall()
+    check("month-continuity", gaps, f"{len(gaps)} missing months, first {gaps[0] if gaps else None}")
+
+    # The spliced series takes the bulk file through SPLICE_MONTH and the monthly
+    # files after it: both must reach the boundary, or months go missing (or the
+    # generators that splice by hand count the overlap twice)
+    splice = con.execute(f"""
+        WITH bounds AS (
+            SELECT tbl,
+                   MAX(month) FILTER (WHERE source = 'old') as bulk_last,
+                   MIN(month) FILTER (WHERE source = 'monthly') as monthly_first
+            FROM store_months GROUP BY tbl
+        )
+        SELECT tbl, bulk_last, monthly_first FROM bounds
+        WHERE bulk_last IS NULL OR monthly_first IS NULL OR bulk_last < '{SPLICE_MONTH}'
+           OR monthly_first > strftime(strptime('{SPLICE_MONTH}', '%Y%m') + INTERVAL 1 MONTH, '%Y%m')
+        ORDER BY ALL
+    """).fetchall()
+    check("splice", splice, f"bulk and monthly files do not meet at {SPLICE_MONTH}")
+
+    overlap = con.execute(f"""
+        SELECT o.tbl, o.month, o.cnt as bulk, m.cnt as monthly
+        FROM store_months o JOIN store_months m USING (tbl, month)
+        WHERE o.source = 'old' AND m.source = 'monthly'
+          AND abs(o.cnt - m.cnt) > {OVERLAP_TOLERANCE} * greatest(o.cnt, m.cnt)
+        ORDER BY ALL
+    """).fetchall()
+    check("overlap-totals", overlap,
+          f"bulk and monthly totals differ by more than {OVERLAP_TOLERANCE:.0%} in {len(overlap)} shared months",
+          status="warn")
+
+stage("Files and codes")
+dupes = con.execute("""
+    SELECT sha256, list(path ORDER BY path) FROM flows.ingested GROUP BY sha256 HAVING COUNT(*) > 1
+""").fetchall()
+check("duplicate-files", dupes, f"{len(dupes)} sets of identical raw files")
+
+known = ", ".join(f"'{code}'" for code in SEP_TYPES)
+unknown = con.execute(f"""
+    SELECT source, sep, any_value(sep_name), SUM(cnt) FROM flows.seps
+    WHERE sep NOT IN ({known}) GROUP BY ALL ORDER BY ALL
+""").fetchall()
+check("sep-codes", unknown, f"unknown separation codes {sorted({r[1] for r in unknown})}")
+
+rif = con.execute(f"""
+    SELECT DISTINCT sep, sep_name FROM flows.seps
+    WHERE source = 'monthly' AND (sep = '{RIF}') != (upper(sep_name) LIKE '%REDUCTION IN FORCE%')
+    ORDER BY ALL
+""").fetchall()
+check("rif-code", rif, f"Reduction in Force is not code {RIF} in the monthly files")
+
+stage("REDACTED shares")
+# Per (source, column, month): the share of counts that is REDACTED/blank. The
+# monthly files' columns come from the profile breakdowns; the bulk file's are
+# the salary/LOS that did not parse.
+shares = con.execute(f"""
+    WITH per_month AS (
+        SELECT flow || '/monthly' as source, dim as col, month,
+               SUM(cnt) FILTER (WHERE value IN ('REDACTED', '')) / SUM(cnt) as share
+        FROM flows.profile GROUP BY ALL
+        UNION ALL
+        SELECT 'sep/' || source, 'salary', month, 1 - SUM(salary_cnt) / SUM(cnt)
+        FROM flows.seps WHERE source = 'old' GROUP BY ALL
+        UNION ALL
+        SELECT 'sep/' || source, 'los', month, 1 - SUM(los_cnt) / SUM(cnt)
+        FROM flows.seps WHERE source = 'old' GROUP BY ALL
+    )
+    SELECT source, col, month, round(COALESCE(share, 0), 4) as share,
+           round(median(COALESCE(share, 0)) OVER (PARTITION BY source, col), 4) as usual
+    FROM per_month
+    QUALIFY share - usual > {REDACTED_JUMP}
+    ORDER BY ALL
+""").fetchall()
+check("redacted", shares, f"{len(shares)} columns/months with a REDACTED/blank share over {REDACTED_JUMP:.0%} above usual")
+
+checks.finish()
+print("Done validate_flows")
@@ -2,6 +2,8 @@ import { notFound } from "next/navigation";
 import Link from "next/link";
 import type { Metadata } from "next";
 import { formatNumber, formatSalary, cleanAgencyName, toTitleCase } from "@/lib/format";
+import { readAgencySeparations } from "@/lib/agency-series";
+import { seriesRows } from "@/lib/series";
 import Breadcrumb from "@/components/Breadcrumb";
 import { AgencyCharts } from "./AgencyCharts";
 import agencyList from "../../../../public/data/agency-list.json";
@@ -37,9 +39,13 @@ async function getAgencyData(code: string) {
 }
 
 async function getAgencySeps(code: string) {
+  // This agency's slice of the shared binary series; the per-agency JSON otherwise
+  const seps = readAgencySeparations(code);
+  if (seps) return seps;
   const filePath = path.join(process.cwd(), "public", "data", "agency-separations", `${code}.json`);
   if (!fs.existsSync(filePath)) return null;
-  return JSON.parse(fs.readFileSync(filePath, "utf-8"));
+  const data = JSON.parse(fs.readFileSync(filePath, "utf-8"));
+  return { ...data, monthly: seriesRows(data.monthly) };
 }
 
 export default async function AgencyDetailPage({ params }: { params: { code: string } }) {
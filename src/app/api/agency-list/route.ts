@@ -2,18 +2,29 @@ import { NextResponse } from "next/server";
 import fs from "fs";
 import path from "path";
 
-export async function GET() {
-  const dir = path.join(process.cwd(), "public", "data", "agencies");
-  const files = fs.readdirSync(dir).filter((f) => f.endsWith(".json"));
-  const agencies = files.map((f) => {
-    const data = JSON.parse(fs.readFileSync(path.join(dir, f), "utf-8"));
-    return {
-      code: data.code,
-      name: data.name,
-      employees: data.employees || 0,
-      avgSalary: data.avgSalary || 0,
-      topOccupations: (data.topOccupations || []).slice(0, 10),
-    };
+// agency-index.json is the prebuilt response (written by scripts/gen1-agency-stats.py);
+// agency-index.sha256 is its content hash, used as the ETag. The hash is read on
+// every request and the body re-read only when it changes, so a rebuild is picked
+// up without a restart (the pipeline writes the .sha256 after the .json).
+const dir = path.join(process.cwd(), "public", "data");
+let cached: { body: string; etag: string } | null = null;
+
+function loadIndex() {
+  const hash = fs.readFileSync(path.join(dir, "agency-index.sha256"), "utf-8").trim();
+  const etag = `"${hash}"`;
+  if (!cached || cached.etag !== etag) {
+    const body = fs.readFileSync(path.join(dir, "agency-index.json"), "utf-8");
+    cached = { body, etag };
+  }
+  return cached;
+}
+
+export async function GET(request: Request) {
+  const { body, etag } = loadIndex();
+  if (request.headers.get("if-none-match") === etag) {
+    return new NextResponse(null, { status: 304, headers: { ETag: etag } });
+  }
+  return new NextResponse(body, {
+    headers: { "Content-Type": "application/json", ETag: etag },
   });
-  return NextResponse.json(agencies);
 }
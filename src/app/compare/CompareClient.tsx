@@ -1,6 +1,7 @@
 "use client";
 import { useState, useMemo, useRef, useEffect, useCallback } from "react";
 import { useSearchParams, useRouter, usePathname } from "next/navigation";
+import Link from "next/link";
 import { formatNumber, formatSalary, cleanAgencyName } from "@/lib/format";
 import agencyRisk from "../../../public/data/agency-risk.json";
 import Breadcrumb from "@/components/Breadcrumb";
@@ -162,6 +163,15 @@ export function CompareClient() {
               </div>
             );
           })}
+
+          <div className="text-right pt-2">
+            <Link
+              href={`/compare/${leftCode.toLowerCase()}-vs-${rightCode.toLowerCase()}`}
+              className="text-sm font-medium text-accent hover:underline"
+            >
+              Full comparison with percentile ranks →
+            </Link>
+          </div>
         </div>
       )}
     </div>
@@ -1,66 +1,16 @@
-import fs from "fs";
-import path from "path";
 import Link from "next/link";
 import { notFound } from "next/navigation";
 import { Metadata } from "next";
+import { ComparedAgency as AgencyData, compareSlug, popularComparisons } from "@/lib/compare";
 
-interface AgencyData {
-  code: string;
-  name: string;
-  employees: number;
-  avgSalary: number | null;
-  riskScore: number;
-  rifCount: number;
-  reductionPct: number;
-  retirementPct: number;
-  stemPct: number;
-  seps2025: number;
-  seps2024: number;
-  sepChange: number;
-  quitCount: number;
-  quitRate: number;
-  retirementCount: number;
-  terminationCount: number;
-  avgTenure: number;
-  retirementEligible: number;
-  experienceLostYears: number;
-}
-
-interface ComparisonData {
-  slug: string;
-  title: string;
-  agency1: AgencyData;
-  agency2: AgencyData;
-}
-
-interface IndexEntry {
-  slug: string;
-  title: string;
-  agency1Name: string;
-  agency2Name: string;
-}
-
-function getComparison(slug: string): ComparisonData | null {
-  try {
-    const filePath = path.join(process.cwd(), "public/data/comparisons", `${slug}.json`);
-    return JSON.parse(fs.readFileSync(filePath, "utf-8"));
-  } catch {
-    return null;
-  }
-}
-
-function getIndex(): IndexEntry[] {
-  const filePath = path.join(process.cwd(), "public/data/comparisons/index.json");
-  return JSON.parse(fs.readFileSync(filePath, "utf-8"));
-}
-
+// Curated matchups are pre-rendered; any other "<code>-vs-<code>" pair renders on request
 export function generateStaticParams() {
-  return getIndex().map((entry) => ({ slug: entry.slug }));
+  return popularComparisons().map((entry) => ({ slug: entry.slug }));
 }
 
 export async function generateMetadata({ params }: { params: Promise<{ slug: string }> }): Promise<Metadata> {
   const { slug } = await params;
-  const data = getComparison(slug);
+  const data = compareSlug(slug);
   if (!data) return { title: "Comparison Not Found — OpenFeds" };
 
   const a1 = data.agency1;
@@ -87,7 +37,8 @@ type Direction = "lower" | "higher" | "neutral";
 
 interface Metric {
   label: string;
-  key: keyof AgencyData;
+  // Feature name in agency-features.json
+  key: string;
   type: "number" | "currency" | "pct" | "score";
   better: Direction;
 }
@@ -95,6 +46,7 @@ interface Metric {
 const metrics: Metric[] = [
   { label: "Employees", key: "employees", type: "number", better: "neutral" },
   { label: "Avg Salary", key: "avgSalary", type: "currency", better: "higher" },
+  { label: "Median Salary", key: "salary:median", type: "currency", better: "higher" },
   { label: "Risk Score", key: "riskScore", type: "score", better: "lower" },
   { label: "RIF Count", key: "rifCount", type: "number", better: "lower" },
   { label: "Reduction %", key: "reductionPct", type: "pct", better: "lower" },
@@ -143,10 +95,10 @@ function generateSummary(a1: AgencyData, a2: AgencyData): string {
 
 export default async function ComparisonPage({ params }: { params: Promise<{ slug: string }> }) {
   const { slug } = await params;
-  const data = getComparison(slug);
+  const data = compareSlug(slug);
   if (!data) notFound();
 
-  const { agency1: a1, agency2: a2 } = data;
+  const { agency1: a1, agency2: a2, features, labels } = data;
   const summary = generateSummary(a1, a2);
 
   // Bar chart data
@@ -213,17 +165,18 @@ export default async function ComparisonPage({ params }: { params: Promise<{ slu
             </tr>
           </thead>
           <tbody>
-            {metrics.map((m, i) => {
-              const v1 = a1[m.key] as number | null;
-              const v2 = a2[m.key] as number | null;
+            {metrics.filter((m) => features[m.key].agency1 != null || features[m.key].agency2 != null).map((m, i) => {
+              const { agency1: v1, agency2: v2, rank1, rank2 } = features[m.key];
               return (
                 <tr key={m.key} className={i % 2 === 0 ? "bg-white" : "bg-gray-50"}>
                   <td className="px-4 py-3 text-sm text-gray-700 font-medium">{m.label}</td>
                   <td className={`px-4 py-3 text-sm text-right ${getColor(v1, v2, m.better, true)}`}>
                     {fmt(v1, m.type)}
+                    {rank1 != null && <span className="block text-xs text-gray-400 font-normal">higher than {rank1}% of agencies</span>}
                   </td>
                   <td className={`px-4 py-3 text-sm text-right ${getColor(v1, v2, m.better, false)}`}>
                     {fmt(v2, m.type)}
+                    {rank2 != null && <span className="block text-xs text-gray-400 font-normal">higher than {rank2}% of agencies</span>}
                   </td>
                 </tr>
               );
@@ -266,6 +219,31 @@ export default async function ComparisonPage({ params }: { params: Promise<{ slu
         </div>
       </div>
 
+      {/* Mixes */}
+      <div className="grid grid-cols-1 md:grid-cols-2 gap-8 mb-8">
+        {[
+          { title: "2025 Separations by Type", mix1: a1.sepMix, mix2: a2.sepMix, label: (k: string) => labels[`sep:${k}`] ?? k },
+          { title: "Employees by Age", mix1: a1.ageMix, mix2: a2.ageMix, label: (k: string) => k.toLowerCase() },
+        ].map(({ title, mix1, mix2, label }) => (
+          <div key={title} className="bg-white rounded-xl shadow-md p-6">
+            <h2 className="font-heading text-xl font-bold mb-4">{title}</h2>
+            <table className="w-full text-sm">
+              <tbody>
+                {Object.keys(mix1)
+                  .filter((k) => mix1[k] > 0 || mix2[k] > 0)
+                  .map((k) => (
+                    <tr key={k} className="border-b border-gray-100">
+                      <td className="py-1.5 text-gray-700">{label(k)}</td>
+                      <td className="py-1.5 text-right text-indigo-600">{fmt(mix1[k], "pct")}</td>
+                      <td className="py-1.5 text-right text-amber-600">{fmt(mix2[k], "pct")}</td>
+                    </tr>
+                  ))}
+              </tbody>
+            </table>
+          </div>
+        ))}
+      </div>
+
       {/* Summary */}
       <div className="bg-white rounded-xl shadow-md p-6 mb-8">
         <h2 className="font-heading text-xl font-bold mb-3">Analysis</h2>
@@ -292,7 +270,7 @@ export default async function ComparisonPage({ params }: { params: Promise<{ slu
       <div className="mt-12">
         <h2 className="font-heading text-xl font-bold mb-4">More Comparisons</h2>
         <div className="grid grid-cols-2 md:grid-cols-3 gap-3">
-          {getIndex()
+          {popularComparisons()
             .filter((e) => e.slug !== slug)
             .slice(0, 9)
             .map((e) => (
@@ -1,8 +1,7 @@
-import fs from "fs";
-import path from "path";
 import Link from "next/link";
 import { Suspense } from "react";
 import { CompareClient } from "./CompareClient";
+import { popularComparisons } from "@/lib/compare";
 
 export const metadata = {
   title: "Compare Federal Agencies — Side-by-Side Analysis — OpenFeds",
@@ -11,20 +10,8 @@ export const metadata = {
   alternates: { canonical: "/compare" },
 };
 
-interface IndexEntry {
-  slug: string;
-  title: string;
-  agency1Name: string;
-  agency2Name: string;
-}
-
-function getIndex(): IndexEntry[] {
-  const filePath = path.join(process.cwd(), "public/data/comparisons/index.json");
-  return JSON.parse(fs.readFileSync(filePath, "utf-8"));
-}
-
 export default function ComparePage() {
-  const comparisons = getIndex();
+  const comparisons = popularComparisons();
 
   return (
     <>
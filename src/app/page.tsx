@@ -7,8 +7,6 @@ import { formatNumber, formatSalary, fixAgencyName } from "@/lib/format";
 import siteStats from "../../public/data/site-stats.json";
 import agencyList from "../../public/data/agency-list.json";
 import agencyRisk from "../../public/data/agency-risk.json";
-import occupations from "../../public/data/occupations.json";
-import statesData from "../../public/data/states.json";
 import trends from "../../public/data/trends.json";
 
 export const metadata: Metadata = {
@@ -21,18 +19,6 @@ export default function Home() {
   const maxEmployees = topAgencies[0]?.employees ?? 1;
   const recentTrends = trends.monthly.slice(-12);
 
-  const searchItems = [
-    ...agencyList
-      .filter((a) => a.code !== "*")
-      .map((a) => ({ label: fixAgencyName(a.name), href: `/agencies/${a.code}`, type: "Agency" as const })),
-    ...occupations
-      .filter((o) => o.code !== "*")
-      .map((o) => ({ label: o.name, href: `/occupations/${o.code}`, type: "Occupation" as const })),
-    ...statesData
-      .filter((s) => s.code !== "*" && s.code !== "NDR")
-      .map((s) => ({ label: s.name, href: `/states/${s.code}`, type: "State" as const })),
-  ];
-
   return (
     <div>
       {/* Data freshness banner */}
@@ -64,7 +50,7 @@ export default function Home() {
               Salary Data
             </Link>
           </div>
-          <HomeSearch items={searchItems} />
+          <HomeSearch />
         </div>
       </section>
 
@@ -1,9 +1,10 @@
 "use client";
 import { TrendAreaChart, SimpleBarChart } from "@/components/Charts";
 import { formatMonth, toTitleCase, fixAgencyName } from "@/lib/format";
+import { seriesRows } from "@/lib/series";
 
 export function SeparationCharts({ data }: { data: any }) {
-  const trendData = (data.monthlyTrend || []).map((m: any) => ({
+  const trendData = seriesRows(data.monthlyTrend).map((m: any) => ({
     label: formatMonth(m.month),
     count: m.count,
   }));
@@ -1,27 +1,26 @@
 "use client";
-import { useState, useRef, useEffect, useMemo } from "react";
+import { useState, useRef, useEffect } from "react";
 import { useRouter } from "next/navigation";
+import { preloadSearch, search, SearchResult } from "@/lib/search";
 
-interface SearchItem {
-  label: string;
-  href: string;
-  type: "Agency" | "Occupation" | "State";
-}
-
-export function HomeSearch({ items }: { items: SearchItem[] }) {
+export function HomeSearch() {
   const [query, setQuery] = useState("");
   const [open, setOpen] = useState(false);
   const [activeIndex, setActiveIndex] = useState(-1);
+  const [results, setResults] = useState<SearchResult[]>([]);
   const ref = useRef<HTMLDivElement>(null);
   const router = useRouter();
 
-  const results = useMemo(() => {
-    if (!query.trim()) return [];
-    const q = query.toLowerCase();
-    return items
-      .filter((item) => item.label.toLowerCase().includes(q))
-      .slice(0, 8);
-  }, [query, items]);
+  // Ranked lookups in the prebuilt index; a stale response never replaces a newer one
+  useEffect(() => {
+    let current = true;
+    search(query)
+      .then((r) => current && setResults(r))
+      .catch(() => current && setResults([]));
+    return () => {
+      current = false;
+    };
+  }, [query]);
 
   useEffect(() => {
     setActiveIndex(-1);
@@ -88,7 +87,10 @@ export function HomeSearch({ items }: { items: SearchItem[] }) {
             setQuery(e.target.value);
             setOpen(true);
           }}
-          onFocus={() => query.trim() && setOpen(true)}
+          onFocus={() => {
+            preloadSearch();
+            if (query.trim()) setOpen(true);
+          }}
           onKeyDown={handleKeyDown}
           aria-label="Search agencies, occupations, or states"
           placeholder="Search agencies, occupations, or states..."
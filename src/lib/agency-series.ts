@@ -0,0 +1,44 @@
+import fs from "fs";
+import path from "path";
+import { SeriesRow } from "./series";
+
+// Server-only: agency-separations.bin (scripts/fix_agency_separations.py): one block of
+// little-endian int32 counts per agency, months x types, located by the index.
+const dir = path.join(process.cwd(), "public", "data");
+type SeriesIndex = {
+  types: string[];
+  months: string[];
+  agencies: Record<string, { name: string; offset: number; start: number; count: number }>;
+};
+let index: SeriesIndex | null = null;
+
+function loadIndex(): SeriesIndex | null {
+  if (!index) {
+    const file = path.join(dir, "agency-separations-index.json");
+    if (!fs.existsSync(file)) return null;
+    index = JSON.parse(fs.readFileSync(file, "utf-8"));
+  }
+  return index;
+}
+
+// Reads only this agency's slice of the shared file; null if it is not there.
+export function readAgencySeparations(code: string): { code: string; name: string; monthly: SeriesRow[] } | null {
+  const idx = loadIndex();
+  const entry = idx?.agencies[code];
+  if (!idx || !entry) return null;
+  const width = idx.types.length;
+  const buf = Buffer.alloc(entry.count * width * 4);
+  const fd = fs.openSync(path.join(dir, "agency-separations.bin"), "r");
+  try {
+    fs.readSync(fd, buf, 0, buf.length, entry.offset);
+  } finally {
+    fs.closeSync(fd);
+  }
+  const monthly: SeriesRow[] = [];
+  for (let m = 0; m < entry.count; m++) {
+    const row: SeriesRow = { month: idx.months[entry.start + m] };
+    idx.types.forEach((t, j) => { row[t] = buf.readInt32LE((m * width + j) * 4); });
+    monthly.push(row);
+  }
+  return { code, name: entry.name, monthly };
+}
@@ -0,0 +1,167 @@
+import fs from "fs";
+import path from "path";
+
+// Server-only: compares any two agencies from agency-features.json
+// (scripts/gen8-workforce-risk.py), one row of numbers per agency. Each feature's
+// column is sorted once for percentile ranks, and each pair is computed once.
+const dir = path.join(process.cwd(), "public", "data");
+
+export interface ComparedAgency {
+  code: string;
+  name: string;
+  employees: number;
+  avgSalary: number | null;
+  avgTenure: number;
+  retirementPct: number;
+  stemPct: number;
+  riskScore: number;
+  seps2025: number;
+  seps2024: number;
+  sepChange: number;
+  rifCount: number;
+  quitRate: number;
+  reductionPct: number;
+  experienceLostYears: number;
+  // Keyed by the part after "salary:", "sep:" and "age:" in the feature name
+  salary: Record<string, number | null>;
+  sepMix: Record<string, number>;
+  ageMix: Record<string, number>;
+}
+
+export interface FeatureComparison {
+  feature: string;
+  agency1: number | null;
+  agency2: number | null;
+  // agency1 - agency2, and that as a percentage of agency2
+  delta: number | null;
+  deltaPct: number | null;
+  // Share of agencies with a lower value, 0-100
+  rank1: number | null;
+  rank2: number | null;
+}
+
+export interface Comparison {
+  slug: string;
+  title: string;
+  agency1: ComparedAgency;
+  agency2: ComparedAgency;
+  features: Record<string, FeatureComparison>;
+  // Display names of the sep: features, as the pipeline's SEP_TYPES has them
+  labels: Record<string, string>;
+}
+
+export interface IndexEntry {
+  slug: string;
+  title: string;
+  codes: [string, string];
+  agency1Name: string;
+  agency2Name: string;
+}
+
+type Row = [string, string, ...(number | null)[]];
+
+let table: {
+  features: string[];
+  labels: Record<string, string>;
+  rows: Map<string, Row>;
+  columns: number[][];
+} | null = null;
+let popular: IndexEntry[] | null = null;
+const memo = new Map<string, Comparison | null>();
+
+function load() {
+  if (!table) {
+    const data: { features: string[]; labels: Record<string, string>; agencies: Row[] } = JSON.parse(
+      fs.readFileSync(path.join(dir, "agency-features.json"), "utf-8"),
+    );
+    const columns = data.features.map((_, i) =>
+      data.agencies
+        .map((row) => row[i + 2] as number | null)
+        .filter((v): v is number => v != null)
+        .sort((x, y) => x - y),
+    );
+    table = { features: data.features, labels: data.labels, rows: new Map(data.agencies.map((row) => [row[0], row])), columns };
+  }
+  return table;
+}
+
+// Curated matchups (scripts/gen-comparisons.js); their slugs are the pre-rendered pages
+export function popularComparisons(): IndexEntry[] {
+  if (!popular) {
+    popular = JSON.parse(fs.readFileSync(path.join(dir, "comparisons", "index.json"), "utf-8"));
+  }
+  return popular!;
+}
+
+// Values below v in an ascending column, by binary search
+function rank(column: number[], v: number | null): number | null {
+  if (v == null || column.length === 0) return null;
+  let lo = 0;
+  let hi = column.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (column[mid] < v) lo = mid + 1;
+    else hi = mid;
+  }
+  return Math.round((lo / column.length) * 100);
+}
+
+function agency(row: Row, features: string[]): ComparedAgency {
+  const out: Record<string, unknown> = { code: row[0], name: row[1], salary: {}, sepMix: {}, ageMix: {} };
+  const groups: Record<string, string> = { salary: "salary", sep: "sepMix", age: "ageMix" };
+  features.forEach((f, i) => {
+    const [prefix, key] = f.split(":");
+    if (key !== undefined) (out[groups[prefix]] as Record<string, number | null>)[key] = row[i + 2];
+    else out[f] = row[i + 2];
+  });
+  return out as unknown as ComparedAgency;
+}
+
+function shortName(name: string): string {
+  return name.replace(/^Department of (the )?/i, "");
+}
+
+export function compareAgencies(code1: string, code2: string, slug = `${code1}-vs-${code2}`.toLowerCase()): Comparison | null {
+  const key = `${code1}|${code2}|${slug}`;
+  if (memo.has(key)) return memo.get(key)!;
+  const { features, labels, rows, columns } = load();
+  const row1 = rows.get(code1);
+  const row2 = rows.get(code2);
+  let result: Comparison | null = null;
+  if (row1 && row2 && code1 !== code2) {
+    const byFeature: Record<string, FeatureComparison> = {};
+    features.forEach((f, i) => {
+      const v1 = row1[i + 2];
+      const v2 = row2[i + 2];
+      const delta = v1 != null && v2 != null ? Math.round((v1 - v2) * 10) / 10 : null;
+      byFeature[f] = {
+        feature: f,
+        agency1: v1,
+        agency2: v2,
+        delta,
+        deltaPct: delta != null && v2 ? Math.round((delta / v2) * 1000) / 10 : null,
+        rank1: rank(columns[i], v1),
+        rank2: rank(columns[i], v2),
+      };
+    });
+    const curated = popularComparisons().find((e) => e.slug === slug);
+    result = {
+      slug,
+      title: curated?.title ?? `${shortName(row1[1])} vs ${shortName(row2[1])}`,
+      agency1: agency(row1, features),
+      agency2: agency(row2, features),
+      features: byFeature,
+      labels,
+    };
+  }
+  memo.set(key, result);
+  return result;
+}
+
+// A curated slug ("dhs-vs-doj") or any two agency codes ("va-vs-hs")
+export function compareSlug(slug: string): Comparison | null {
+  const curated = popularComparisons().find((e) => e.slug === slug);
+  if (curated) return compareAgencies(curated.codes[0], curated.codes[1], slug);
+  const m = /^([a-z0-9]{2})-vs-([a-z0-9]{2})$/.exec(slug);
+  return m ? compareAgencies(m[1].toUpperCase(), m[2].toUpperCase(), slug) : null;
+}
@@ -0,0 +1,121 @@
+// Client for public/data/search/ (scripts/gen9-search-index.py): docs are numbered
+// by popularity, so posting lists in id order are already ranked. docs.json is
+// fetched once; a shard only when a query needs one of its keys.
+
+export type SearchType = "Agency" | "Occupation" | "State";
+
+export interface SearchResult {
+  label: string;
+  href: string;
+  type: SearchType;
+}
+
+const HREF: Record<SearchType, string> = {
+  Agency: "/agencies",
+  Occupation: "/occupations",
+  State: "/states",
+};
+
+interface Docs {
+  types: SearchType[];
+  docs: [string, number, string][];
+  shards: string[];
+}
+
+let docs: Promise<Docs> | null = null;
+let normalized: string[] = [];
+const shards = new Map<string, Promise<Record<string, number[]>>>();
+
+export function normalize(text: string): string {
+  return text
+    .normalize("NFKD")
+    .replace(/[\u0300-\u036f]/g, "")
+    .toLowerCase()
+    .replace(/[^a-z0-9]+/g, " ")
+    .trim();
+}
+
+function loadDocs(): Promise<Docs> {
+  if (!docs) {
+    docs = fetch("/data/search/docs.json")
+      .then((r) => r.json())
+      .then((d: Docs) => {
+        // The index also posts each entity's code ("VA", "0610") as a word
+        normalized = d.docs.map(([label, , code]) => normalize(`${label} ${code}`));
+        return d;
+      });
+  }
+  return docs;
+}
+
+function shardOf(key: string): string {
+  return /[a-z0-9]/.test(key[0]) ? key[0] : "_";
+}
+
+async function postings(key: string, available: string[]): Promise<number[]> {
+  const name = shardOf(key);
+  if (!available.includes(name)) return [];
+  if (!shards.has(name)) {
+    shards.set(name, fetch(`/data/search/${name}.json`).then((r) => r.json()));
+  }
+  return (await shards.get(name)!)[key] || [];
+}
+
+// Intersection of ascending id lists
+function intersect(a: number[], b: number[]): number[] {
+  const out: number[] = [];
+  let i = 0;
+  let j = 0;
+  while (i < a.length && j < b.length) {
+    if (a[i] === b[j]) {
+      out.push(a[i]);
+      i++;
+      j++;
+    } else if (a[i] < b[j]) i++;
+    else j++;
+  }
+  return out;
+}
+
+// Start fetching docs.json (e.g. when the search box gets focus)
+export function preloadSearch() {
+  loadDocs();
+}
+
+export async function search(query: string, limit = 8): Promise<SearchResult[]> {
+  const q = normalize(query);
+  if (!q) return [];
+  const index = await loadDocs();
+  const tokens = q.split(" ");
+
+  let ids: number[] | null = null;
+  for (const token of tokens) {
+    // Short tokens are word prefixes; longer ones match anywhere through their trigrams
+    const keys = token.length < 3
+      ? [token]
+      : Array.from({ length: token.length - 2 }, (_, i) => token.slice(i, i + 3));
+    for (const key of keys) {
+      const list = await postings(key, index.shards);
+      ids = ids === null ? list : intersect(ids, list);
+      if (ids.length === 0) return [];
+    }
+  }
+
+  // Trigrams can come from different words: confirm, then put whole-label and
+  // word-prefix matches first (popularity order within each)
+  const rank = (id: number) => {
+    const label = normalized[id];
+    if (label.startsWith(q)) return 0;
+    return (" " + label).includes(" " + tokens[0]) ? 1 : 2;
+  };
+  return (ids || [])
+    .filter((id) => tokens.every((t) => normalized[id].includes(t)))
+    .map((id) => ({ id, rank: rank(id) }))
+    .sort((a, b) => a.rank - b.rank || a.id - b.id)
+    .slice(0, limit)
+    .map(({ id }) => {
+      const [label, type, code] = index.docs[id];
+      const kind = index.types[type];
+      return { label, type: kind, href: `${HREF[kind]}/${code}` };
+    });
+}
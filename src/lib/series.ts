@@ -0,0 +1,15 @@
+// Monthly series in public/data come either as rows ([{ month, SA, ... }]) or,
+// with `build.py --series columnar`, as parallel arrays ({ month: [...], SA: [...] }).
+export type SeriesRow = { month: string; [key: string]: string | number };
+
+export function seriesRows(series: any): SeriesRow[] {
+  if (!series) return [];
+  if (Array.isArray(series)) return series;
+  const keys = Object.keys(series);
+  const months: string[] = series.month || [];
+  return months.map((_, i) => {
+    const row: SeriesRow = { month: months[i] };
+    for (const key of keys) row[key] = series[key][i];
+    return row;
+  });
+}